@@ -113,13 +113,40 @@ from .calculator import (
     calc_weekly_distributions as calc_weekly,
     calc_monthly_distributions_by_days as calc_monthly_by_days,
     calc_monthly_distributions_by_weeks as calc_monthly_by_weeks,
+    calc_hourly_distributions as calc_hourly,
+    calc_minutely_distributions as calc_minutely,
+    calc_distributions_by_pattern_between as calc_dist_between,
+    iter_distributions_by_pattern as iter_dist_by_pattern,
 )
+from .date_index import ScheduleDateIndex
+from .exclusions import compile_exclusions, register_exclusion_calendar
+from .fanout import (
+    calc_distributions_by_pattern_for_timezones as calc_dist_for_timezones,
+    flatten_timezone_distributions,
+)
+from .horizon import HorizonMaterializer
+from .incremental import calc_distributions_delta as calc_dist_delta
+from .sharding import assign_schedules_to_shards
+from .store import DistributionStore
 
 __all__ = [
     "calc_dist_by_pattern",
     "calc_daily",
     "calc_weekly",
     "calc_monthly_by_days",
-    "calc_monthly_by_weeks"
+    "calc_monthly_by_weeks",
+    "calc_hourly",
+    "calc_minutely",
+    "iter_dist_by_pattern",
+    "calc_dist_between",
+    "calc_dist_delta",
+    "DistributionStore",
+    "compile_exclusions",
+    "register_exclusion_calendar",
+    "calc_dist_for_timezones",
+    "flatten_timezone_distributions",
+    "HorizonMaterializer",
+    "ScheduleDateIndex",
+    "assign_schedules_to_shards",
 ]
 __version__ = "0.1.4"
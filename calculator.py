@@ -1,7 +1,13 @@
 import calendar
-from typing import Optional, List, Dict, Tuple
+import datetime
+import math
+from functools import lru_cache
+from typing import Optional, List, Dict, Tuple, Iterable, Iterator
 
 import arrow
+from dateutil import tz as dateutil_tz
+
+from .exclusions import ExclusionDays, compile_exclusions
 
 calendar.setfirstweekday(calendar.SUNDAY)
 AM = "AM"
@@ -15,6 +21,16 @@ TIME_FORMAT_WITHOUT_SECOND = "YYYY-MM-DD HH:mm"
 START_TIME = "start_time"
 END_TIME = "end_time"
 
+MINUTES_OF_DAY = 24 * 60
+_UNIX_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+# "HH:mm" to the seconds since 00:00
+_SECONDS_OF_TIME = {
+    f"{_hour:02d}:{_minute:02d}": _hour * 3600 + _minute * 60 for _hour in range(24) for _minute in range(60)
+}
+WALL_TIME_FORMAT = "%Y-%m-%d %H:%M"
+_TRANSITION_SCAN_STEP_MINUTES = 7 * 24 * 60  # offset changes of a timezone are assumed to be a week apart at least
+SUB_DAILY_PATTERNS = ("Hourly", "Minutely")
+
 WEEKDAYS = {
     "Sunday": 0,
     "Monday": 1,
@@ -36,7 +52,7 @@ WEEK_DAYS_KEYWORDS = {
 
 def get_weekly_day_offset_from_first_day(weekdays: List[str], start_date: arrow.Arrow) -> tuple[List[int], int, int]:
     month_weeks = calendar.monthcalendar(start_date.year, start_date.month)
-    cur_month_day = int(start_date.format("D"))  # current day of month
+    cur_month_day = start_date.day  # current day of month
     cur_week = 0
 
     day_offset = []
@@ -90,13 +106,168 @@ def get_schedule_range_time(range_start: str, range_end: str, timezone: str) ->
     return _start, _end
 
 
+@lru_cache(maxsize=1 << 16)
+def _format_date(ordinal: int) -> str:
+    return datetime.date.fromordinal(ordinal).isoformat()
+
+
+@lru_cache(maxsize=MINUTES_OF_DAY)
+def _format_time(hour: int, minute: int) -> str:
+    return f" {hour:02d}:{minute:02d}"
+
+
+def format_time_without_second(time: arrow.Arrow) -> str:
+    """
+    Format a time like `time.format(TIME_FORMAT_WITHOUT_SECOND)`. The date and the time of day parts are cached
+    and joined, instead of parsing the format tokens on every call
+    :param time: the time. e.g. 2022-05-18T20:30:00+08:00
+    :return: the formatted string. e.g. 2022-05-18 20:30
+    """
+    _datetime = time.datetime
+    return _format_date(_datetime.toordinal()) + _format_time(_datetime.hour, _datetime.minute)
+
+
+@lru_cache(maxsize=None)
+def _get_tzinfo(timezone: str) -> datetime.tzinfo:
+    return arrow.parser.TzinfoParser.parse(timezone)  # the same tzinfo Arrow parses the distributions with
+
+
+@lru_cache(maxsize=1024)
+def _get_day_utc_offsets(timezone: str, year: int) -> Tuple[Optional[int], ...]:
+    # the UTC offset seconds of every day of a year, None on the days the offset changes
+    tzinfo = _get_tzinfo(timezone)
+    first_ordinal = datetime.date(year, 1, 1).toordinal()
+    days = datetime.date(year + 1, 1, 1).toordinal() - first_ordinal
+
+    def get_offset(day: int) -> int:
+        # the time is aware, so the offset is never None
+        offset = datetime.datetime.fromordinal(first_ordinal + day).replace(tzinfo=tzinfo).utcoffset()
+        return (offset or datetime.timedelta()) // datetime.timedelta(seconds=1)
+
+    offsets: List[Optional[int]] = []
+    day, day_offset = 0, get_offset(0)
+    while day < days:
+        # offset changes of a timezone are assumed to be a week apart at least, like `get_timezone_gaps`
+        week_end = min(day + 7, days)
+        week_end_offset = get_offset(week_end)
+        if week_end_offset == day_offset:
+            offsets.extend([day_offset] * (week_end - day))
+        else:
+            for _day in range(day, week_end):
+                next_offset = get_offset(_day + 1)
+                offsets.append(day_offset if next_offset == day_offset else None)
+                day_offset = next_offset
+        day, day_offset = week_end, week_end_offset
+    return tuple(offsets)
+
+
+def get_day_utc_offsets(timezone: str, since: datetime.date, until: datetime.date) -> List[Optional[int]]:
+    """
+    Get the UTC offset of every day between two dates
+    :param timezone: the timezone. e.g. America/New_York
+    :param since: the first date
+    :param until: the last date
+    :return: the UTC offset seconds of every day, None on the days the UTC offset changes. e.g. [-18000, None]
+    """
+    offsets: List[Optional[int]] = []
+    for year in range(since.year, until.year + 1):
+        offsets.extend(_get_day_utc_offsets(timezone, year))
+    first_day = since.toordinal() - datetime.date(since.year, 1, 1).toordinal()
+    return offsets[first_day:first_day + until.toordinal() - since.toordinal() + 1]
+
+
+@lru_cache(maxsize=1 << 16)
+def _get_day_start_epoch(timezone: str, date_string: str) -> Optional[int]:
+    # epoch seconds of the wall clock 00:00 of a day when the whole day has one UTC offset, otherwise None
+    date = datetime.date.fromisoformat(date_string)
+    offset = _get_day_utc_offsets(timezone, date.year)[date.timetuple().tm_yday - 1]
+    if offset is None:
+        return None
+    return (date.toordinal() - _UNIX_EPOCH_ORDINAL) * 86400 - offset
+
+
+def iter_wall_time_epochs(time_strings: Iterable[str], timezone: str) -> Iterator[int]:
+    """
+    Convert distribution time strings to epoch seconds like
+    `arrow.get(time_string, TIME_FORMAT_WITHOUT_SECOND, tzinfo=timezone).int_timestamp`. The seconds of the wall
+    clock time are added to the cached epoch of its day start, only the times on the days the UTC offset changes
+    are converted through the timezone one by one
+    :param time_strings: the distribution time strings. e.g. ['2022-05-18 20:30']
+    :param timezone: timezone of the distributions. e.g. Asia/Shanghai
+    :return: an iterator of epoch seconds
+    """
+    tzinfo = _get_tzinfo(timezone)
+    day_starts: Dict[str, Optional[int]] = {}
+    for time_string in time_strings:
+        date_string = time_string[:10]
+        if date_string in day_starts:
+            day_start = day_starts[date_string]
+        else:
+            day_start = day_starts[date_string] = _get_day_start_epoch(timezone, date_string)
+        if day_start is None:
+            yield int(datetime.datetime.fromisoformat(time_string).replace(tzinfo=tzinfo).timestamp())
+        else:
+            yield day_start + _SECONDS_OF_TIME[time_string[11:]]
+
+
+def get_timezone_gaps(
+        timezone: datetime.tzinfo,
+        since: datetime.date,
+        until: datetime.date
+) -> List[Tuple[str, str, datetime.timedelta]]:
+    """
+    Get the wall clock gaps which are skipped when the clocks of a timezone jump forward
+    :param timezone: the timezone
+    :param since: the first date to scan
+    :param until: the date to scan until
+    :return:
+        A list of (gap start wall time, gap end wall time, gap length).
+        e.g. [('2022-03-13 02:00', '2022-03-13 03:00', timedelta(hours=1))]
+    """
+    epoch = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+    def get_offset(minutes: int) -> datetime.timedelta:
+        # the time is aware, so the offset is never None
+        return (epoch + datetime.timedelta(minutes=minutes)).astimezone(timezone).utcoffset() or datetime.timedelta()
+
+    scan_start = (datetime.datetime.combine(since, datetime.time(), datetime.timezone.utc) - epoch) // \
+        datetime.timedelta(minutes=1)
+    scan_end = (datetime.datetime.combine(until, datetime.time(), datetime.timezone.utc) - epoch) // \
+        datetime.timedelta(minutes=1)
+
+    gaps = []
+    cur, cur_offset = scan_start, get_offset(scan_start)
+    while cur < scan_end:
+        nxt = min(cur + _TRANSITION_SCAN_STEP_MINUTES, scan_end)
+        nxt_offset = get_offset(nxt)
+        if nxt_offset != cur_offset:
+            low, high = cur, nxt  # bisect to the first minute after the offset changed
+            while high - low > 1:
+                mid = (low + high) // 2
+                if get_offset(mid) == cur_offset:
+                    low = mid
+                else:
+                    high = mid
+            if nxt_offset > cur_offset:
+                gap_start = (epoch + datetime.timedelta(minutes=high) + cur_offset).replace(tzinfo=None)
+                gap_length = nxt_offset - cur_offset
+                gaps.append((
+                    gap_start.strftime(WALL_TIME_FORMAT),
+                    (gap_start + gap_length).strftime(WALL_TIME_FORMAT),
+                    gap_length
+                ))
+        cur, cur_offset = nxt, nxt_offset
+    return gaps
+
+
 def calc_daily_distributions(
         range_start_date: str,
         range_end_date: str,
         daily_steps: int,
         timezone: str,
         schedule_start: str,
-        schedule_end: Optional[str] = None
+        schedule_end: Optional[str] = None,
+        exclusions: Optional[ExclusionDays] = None
 ) -> List[Dict[str, str]]:
     """
     Calculate schedule distributions by daily pattern
@@ -112,6 +283,8 @@ def calc_daily_distributions(
         Schedule start time. e.g. 08:30 PM
     :param schedule_end:
         Schedule end time, which is optional. e.g. 11:00 PM
+    :param exclusions:
+        Excluded days compiled by `compile_exclusions`, which is optional. Instances start on these days are skipped
     :return:
         A list with all schedule distribution start&end time string.
     :raise:
@@ -125,20 +298,44 @@ def calc_daily_distributions(
     )
     _schedule_start, _schedule_end = schedule_ranges
 
-    instance_times = []
-    for day in range(0, range_distance.days + 1, daily_steps):
-        _start = range_start.shift(days=day, hours=_schedule_start[HOUR], minutes=_schedule_start[MINUTE])
-        if _start > range_end.shift(days=1) or _start < range_start:
+    # the instances on the days with a DST gap are built by Arrow, which moves the times in the gap forward.
+    # The others are joined straight from the cached date and time strings
+    range_start_ordinal = range_start.date().toordinal()
+    gap_ordinals = set()
+    for gap_start, gap_end, _ in get_timezone_gaps(
+            range_start.tzinfo, range_start.date() - datetime.timedelta(days=1),
+            range_end.date() + datetime.timedelta(days=3)
+    ):
+        gap_ordinals.add(datetime.date.fromisoformat(gap_start[:10]).toordinal())
+        gap_ordinals.add(datetime.date.fromisoformat(gap_end[:10]).toordinal())
+
+    start_time = _format_time(_schedule_start[HOUR], _schedule_start[MINUTE])
+    end_time, end_day_offset = "", 0
+    if _schedule_end:
+        end_time = _format_time(_schedule_end[HOUR], _schedule_end[MINUTE])
+        if _schedule_end[HOUR] < _schedule_start[HOUR]:  # cross a day, the end time is on the next day
+            end_day_offset = 1
+            gap_ordinals |= {ordinal - 1 for ordinal in gap_ordinals}
+
+    ordinals = range(range_start_ordinal, range_start_ordinal + range_distance.days + 1, daily_steps)
+    instance_times: list = [None] * len(ordinals)  # filled in place, the skipped ones are cut off at the end
+    count = 0
+    for ordinal in ordinals:
+        if exclusions and ordinal in exclusions:  # skip excluded day before building it
             continue
-
-        _distribution = {START_TIME: _start.format(TIME_FORMAT_WITHOUT_SECOND)}
-        if _schedule_end:
-            _end = range_start.shift(days=day, hours=_schedule_end[HOUR], minutes=_schedule_end[MINUTE])
-            if _schedule_end[HOUR] < _schedule_start[HOUR]:
-                _end = _end.shift(days=1)
-            _distribution[END_TIME] = _end.format(TIME_FORMAT_WITHOUT_SECOND)
-
-        instance_times.append(_distribution)
+        if ordinal in gap_ordinals:
+            _distribution = _generate_schedule_distribution_instance(
+                ordinal - range_start_ordinal, range_start, range_end, 0, _schedule_start, _schedule_end
+            )
+            if not _distribution:
+                continue
+        else:
+            _distribution = {START_TIME: _format_date(ordinal) + start_time}
+            if end_time:
+                _distribution[END_TIME] = _format_date(ordinal + end_day_offset) + end_time
+        instance_times[count] = _distribution
+        count += 1
+    del instance_times[count:]
     return instance_times
 
 
@@ -149,7 +346,8 @@ def calc_weekly_distributions(
         weekdays: List[str],
         timezone: str,
         schedule_start: str,
-        schedule_end: Optional[str] = None
+        schedule_end: Optional[str] = None,
+        exclusions: Optional[ExclusionDays] = None
 ) -> List[Dict[str, str]]:
     """
     Calculate schedule distributions by weekly pattern
@@ -167,6 +365,8 @@ def calc_weekly_distributions(
         Schedule start time. e.g. 08:30 PM
     :param schedule_end:
         Schedule end time, which is optional. e.g. 11:00 PM
+    :param exclusions:
+        Excluded days compiled by `compile_exclusions`, which is optional. Instances start on these days are skipped
     :return:
         A list with all schedule distribution start&end time string.
     :raise:
@@ -188,29 +388,19 @@ def calc_weekly_distributions(
     for day in range(_range_start, range_distance.days + 7, weekly_steps * 7):
         _each_start = range_start.shift(days=day)
         week_day_offsets, _, cur_week = get_weekly_day_offset_from_first_day(weekdays, _each_start)
-        cur_month = int(_each_start.format("M"))  # current day month
-        cur_year = int(_each_start.format("YYYY"))  # current day month
+        cur_month = _each_start.month  # current day month
+        cur_year = _each_start.year  # current day year
         _week_index = f"{cur_year}-{cur_month}-{cur_week}"
         if _week_index in calculated_weeks:  # already calculated
             continue
         calculated_weeks.add(_week_index)
 
         for week_day_offset in week_day_offsets:
-            _start = range_start.shift(
-                days=day + week_day_offset, hours=_schedule_start[HOUR], minutes=_schedule_start[MINUTE]
+            _distribution = _generate_schedule_distribution_instance(
+                day, range_start, range_end, week_day_offset, _schedule_start, _schedule_end, exclusions
             )
-            if _start > range_end.shift(days=1) or _start < range_start:
-                continue
-
-            _distribution = {START_TIME: _start.format(TIME_FORMAT_WITHOUT_SECOND)}
-            if _schedule_end:
-                _end = range_start.shift(
-                    days=day + week_day_offset, hours=_schedule_end[HOUR], minutes=_schedule_end[MINUTE]
-                )
-                if _schedule_end[HOUR] < _schedule_start[HOUR]:
-                    _end = _end.shift(days=1)
-                _distribution[END_TIME] = _end.format(TIME_FORMAT_WITHOUT_SECOND)
-            instance_times.append(_distribution)
+            if _distribution:
+                instance_times.append(_distribution)
     return instance_times
 
 
@@ -262,7 +452,8 @@ def calc_monthly_distributions_by_days(
         day_of_month: int,
         monthly_steps: int,
         schedule_start: str,
-        schedule_end: Optional[str] = None
+        schedule_end: Optional[str] = None,
+        exclusions: Optional[ExclusionDays] = None
 ) -> List[Dict[str, str]]:
     """
         Calculate schedule distributions by monthly day pattern
@@ -281,6 +472,9 @@ def calc_monthly_distributions_by_days(
             Schedule start time. e.g. 08:30 PM
         :param schedule_end:
             Schedule end time, which is optional. e.g. 11:00 PM
+        :param exclusions:
+            Excluded days compiled by `compile_exclusions`, which is optional.
+            Instances start on these days are skipped
         :return:
             A list with all schedule distribution start&end time string.
         :raise:
@@ -298,7 +492,7 @@ def calc_monthly_distributions_by_days(
     cur_step = -1
     for day in range(0, range_distance.days + 31):
         _each_start = range_start.shift(days=day)
-        _cur_month_day = int(_each_start.format("D"))  # current day of month
+        _cur_month_day = _each_start.day  # current day of month
         _month_day_offset = get_monthly_day_offset_from_first_day_by_days(day_of_month, _each_start)
         # get the total steps need to skip according to the schedule's monthly options
         _monthly_steps = get_monthly_steps_by_every_months(monthly_steps, _each_start)
@@ -307,7 +501,7 @@ def calc_monthly_distributions_by_days(
         if is_terminated:
             continue
         _distribution = _generate_schedule_distribution_instance(
-            day, range_start, range_end, _month_day_offset, _schedule_start, _schedule_end
+            day, range_start, range_end, _month_day_offset, _schedule_start, _schedule_end, exclusions
         )
         if _distribution:
             instances.append(_distribution)
@@ -320,15 +514,19 @@ def _generate_schedule_distribution_instance(
         range_end: arrow.Arrow,
         month_day_offset: int,
         schedule_start: dict,
-        schedule_end: dict
+        schedule_end: dict,
+        exclusions: Optional[ExclusionDays] = None
 ) -> dict:
+    if exclusions and range_start.date().toordinal() + day + month_day_offset in exclusions:
+        return {}  # skip excluded day before building it
+
     _start = range_start.shift(
         days=day + month_day_offset, hours=schedule_start[HOUR], minutes=schedule_start[MINUTE]
     )  # shift the range start to each instance start time
     if _start > range_end.shift(days=1) or _start < range_start:  # skip instance if out of range
         return {}
 
-    _distribution = {START_TIME: _start.format(TIME_FORMAT_WITHOUT_SECOND)}
+    _distribution = {START_TIME: format_time_without_second(_start)}
     if schedule_end:
         _end = range_start.shift(
             days=day + month_day_offset, hours=schedule_end[HOUR], minutes=schedule_end[MINUTE]
@@ -336,7 +534,7 @@ def _generate_schedule_distribution_instance(
 
         if schedule_end[HOUR] < schedule_start[HOUR]:  # cross a day, then end time need to shift 1 day
             _end = _end.shift(days=1)
-        _distribution[END_TIME] = _end.format(TIME_FORMAT_WITHOUT_SECOND)
+        _distribution[END_TIME] = format_time_without_second(_end)
     return _distribution
 
 
@@ -362,7 +560,8 @@ def calc_monthly_distributions_by_weeks(
         weekday: str,
         monthly_steps: int,
         schedule_start: str,
-        schedule_end: Optional[str] = None
+        schedule_end: Optional[str] = None,
+        exclusions: Optional[ExclusionDays] = None
 ) -> List[Dict[str, str]]:
     """
         Calculate schedule distributions by monthly day pattern
@@ -384,6 +583,9 @@ def calc_monthly_distributions_by_weeks(
             Schedule start time. e.g. 08:30 PM
         :param schedule_end:
             Schedule end time, which is optional. e.g. 11:00 PM
+        :param exclusions:
+            Excluded days compiled by `compile_exclusions`, which is optional.
+            Instances start on these days are skipped
         :return:
             A list with all schedule distribution start&end time string.
         :raise:
@@ -402,7 +604,7 @@ def calc_monthly_distributions_by_weeks(
     cur_step = -1
     for day in range(0, range_distance.days + 31):
         _each_start = range_start.shift(days=day)
-        _cur_month_day = int(_each_start.format("D"))  # current day of month
+        _cur_month_day = _each_start.day  # current day of month
         _month_day_offset = get_monthly_day_offset_from_first_day_by_weeks(week_ordinal, weekday, _each_start)
         # get the total steps need to skip according to the schedule's monthly options
         _monthly_steps = get_monthly_steps_by_every_months(monthly_steps, _each_start)
@@ -411,13 +613,206 @@ def calc_monthly_distributions_by_weeks(
         if is_terminated:
             continue
         _distribution = _generate_schedule_distribution_instance(
-            day, range_start, range_end, _month_day_offset, _schedule_start, _schedule_end
+            day, range_start, range_end, _month_day_offset, _schedule_start, _schedule_end, exclusions
         )
         if _distribution:
             instances.append(_distribution)
     return instances
 
 
+def get_sub_daily_period_days(minutely_steps: int, schedule_end: Optional[str] = None) -> int:
+    """
+    Get the count of days the sub-daily start times repeat after
+    :param minutely_steps: the minutes between two schedules. e.g. 15
+    :param schedule_end: The daily active window end time, which is optional. e.g. 05:00 PM
+    :return: 1 with an active window, which starts again every day, otherwise the days until the continuous
+        steps fall on the same time of day again. e.g. 7 for every 7 hours
+    """
+    if schedule_end is not None:
+        return 1
+    return minutely_steps // math.gcd(minutely_steps, MINUTES_OF_DAY)
+
+
+def get_sub_daily_slots(
+        minutely_steps: int,
+        schedule_start: str,
+        schedule_end: Optional[str] = None
+) -> List[Tuple[int, int, int]]:
+    """
+    Get the start times of the sub-daily schedules in one period of `get_sub_daily_period_days` days.
+    With an active window the schedules start again at `schedule_start` every day, so the steps have to divide
+    the window. Without it the schedules go on continuously from `schedule_start` of the first day.
+    :param minutely_steps: the minutes between two schedules. e.g. 15
+    :param schedule_start: The daily active window start time. e.g. 09:00 AM
+    :param schedule_end: The daily active window end time, which is optional. e.g. 05:00 PM
+    :return: A list of (day offset, hour, minute), the day offset counts the days from the first day of the period
+    :raise:
+        ValueError
+    """
+    if minutely_steps <= 0:
+        raise ValueError("Sub-daily steps should be positive")
+    _schedule_start, _schedule_end = get_schedule_ranges(schedule_start, schedule_end)
+
+    window_start = _schedule_start[HOUR] * 60 + _schedule_start[MINUTE]
+    window_length = get_sub_daily_period_days(minutely_steps, schedule_end) * MINUTES_OF_DAY - 1
+    if _schedule_end:
+        if minutely_steps > MINUTES_OF_DAY:
+            raise ValueError("Sub-daily steps should not be longer than a day")
+        window_length = (_schedule_end[HOUR] * 60 + _schedule_end[MINUTE] - window_start) % MINUTES_OF_DAY
+        if window_length % minutely_steps:
+            raise ValueError("Sub-daily steps should divide the active window")
+
+    slots = []
+    for minutes in range(window_start, window_start + window_length + 1, minutely_steps):
+        _hour, _minute = divmod(minutes % MINUTES_OF_DAY, 60)
+        slots.append((minutes // MINUTES_OF_DAY, _hour, _minute))
+    return slots
+
+
+def iter_sub_daily_distributions(
+        range_start_date: str,
+        range_end_date: str,
+        minutely_steps: int,
+        timezone: str,
+        schedule_start: str,
+        schedule_end: Optional[str] = None,
+        exclusions: Optional[ExclusionDays] = None
+) -> Iterator[Dict[str, str]]:
+    """
+    Lazily calculate schedule distributions repeating within every day
+    :param range_start_date:
+        This distributions range start date. e.g. 2022-05-18
+    :param range_end_date:
+        This distributions range end date. e.g. 2022-06-18
+    :param minutely_steps:
+        Sub-daily schedule pattern. e.g. If minutely steps is 15, which means there will have a schedule every
+        15 minutes
+    :param timezone:
+        Should calculate by which timezone. e.g. Asia/Shanghai
+    :param schedule_start:
+        The daily active window start time, which is the first schedule of every day. e.g. 09:00 AM
+    :param schedule_end:
+        The daily active window end time, which is optional. e.g. 05:00 PM
+        The window goes on to the next day when it is earlier than `schedule_start`. When it is not provided,
+        the schedules go on continuously until the `schedule_start` of the day after `range_end_date`.
+        The window of `range_end_date` is not cut at the end of the day, so it can go past the range
+    :param exclusions:
+        Excluded days compiled by `compile_exclusions`, which is optional. Instances start on these days are skipped
+    :return:
+        An iterator of schedule distribution start time string. The wall clock times skipped by DST are dropped.
+    :raise:
+        ValueError
+    """
+    range_start, range_end = get_schedule_range_time(range_start_date, range_end_date, timezone)
+    tzinfo = range_start.tzinfo
+
+    # the slots are the same every period, so their time string is built only once
+    slots = [
+        (day_offset * MINUTES_OF_DAY + _hour * 60 + _minute, day_offset, _hour, _minute, f" {_hour:02d}:{_minute:02d}")
+        for day_offset, _hour, _minute in get_sub_daily_slots(minutely_steps, schedule_start, schedule_end)
+    ]
+    period_days = get_sub_daily_period_days(minutely_steps, schedule_end)
+    window_start = slots[0][0]
+
+    def has_transition(_day: datetime.date) -> bool:
+        _next_day = _day + datetime.timedelta(days=1)
+        return datetime.datetime(_day.year, _day.month, _day.day, tzinfo=tzinfo).utcoffset() != \
+            datetime.datetime(_next_day.year, _next_day.month, _next_day.day, tzinfo=tzinfo).utcoffset()
+
+    # the instances come in the order of their day, so only the date string of the current day is kept
+    _ordinal_date: Tuple[int, str, bool] = (0, "", False)  # (day ordinal, date string, has DST transition)
+    start_ordinal, end_ordinal = range_start.date().toordinal(), range_end.date().toordinal()
+    for period_ordinal in range(start_ordinal, end_ordinal + 1, period_days):
+        # the schedules go on until the window start of the day after the range end
+        minutes_limit = (end_ordinal + 1 - period_ordinal) * MINUTES_OF_DAY + window_start
+        for _minutes, day_offset, _hour, _minute, _time in slots:
+            if _minutes >= minutes_limit:
+                return
+            _ordinal = period_ordinal + day_offset
+            if exclusions and _ordinal in exclusions:
+                continue
+            if _ordinal != _ordinal_date[0]:
+                _day = datetime.date.fromordinal(_ordinal)
+                _ordinal_date = (_ordinal, _day.isoformat(), has_transition(_day))
+            _, _date, _has_transition = _ordinal_date
+            if _has_transition and not dateutil_tz.datetime_exists(
+                    datetime.datetime.fromisoformat(_date).replace(hour=_hour, minute=_minute, tzinfo=tzinfo)
+            ):
+                continue
+            yield {START_TIME: _date + _time}
+
+
+def calc_hourly_distributions(
+        range_start_date: str,
+        range_end_date: str,
+        hourly_steps: int,
+        timezone: str,
+        schedule_start: str,
+        schedule_end: Optional[str] = None,
+        exclusions: Optional[ExclusionDays] = None
+) -> List[Dict[str, str]]:
+    """
+    Calculate schedule distributions by hourly pattern
+    :param range_start_date:
+        This distributions range start date. e.g. 2022-05-18
+    :param range_end_date:
+        This distributions range end date. e.g. 2022-06-18
+    :param hourly_steps:
+        Hourly schedule pattern. e.g. If hourly steps is 2, which means there will have a schedule every 2 hours
+    :param timezone:
+        Should calculate by which timezone. e.g. Asia/Shanghai
+    :param schedule_start:
+        The daily active window start time, which is the first schedule of every day. e.g. 09:00 AM
+    :param schedule_end:
+        The daily active window end time, which is optional. e.g. 05:00 PM
+    :param exclusions:
+        Excluded days compiled by `compile_exclusions`, which is optional. Instances start on these days are skipped
+    :return:
+        A list with all schedule distribution start time string.
+    :raise:
+        ValueError
+    """
+    return list(iter_sub_daily_distributions(
+        range_start_date, range_end_date, hourly_steps * 60, timezone, schedule_start, schedule_end, exclusions
+    ))
+
+
+def calc_minutely_distributions(
+        range_start_date: str,
+        range_end_date: str,
+        minutely_steps: int,
+        timezone: str,
+        schedule_start: str,
+        schedule_end: Optional[str] = None,
+        exclusions: Optional[ExclusionDays] = None
+) -> List[Dict[str, str]]:
+    """
+    Calculate schedule distributions by minutely pattern
+    :param range_start_date:
+        This distributions range start date. e.g. 2022-05-18
+    :param range_end_date:
+        This distributions range end date. e.g. 2022-06-18
+    :param minutely_steps:
+        Minutely schedule pattern. e.g. If minutely steps is 15, which means there will have a schedule every
+        15 minutes
+    :param timezone:
+        Should calculate by which timezone. e.g. Asia/Shanghai
+    :param schedule_start:
+        The daily active window start time, which is the first schedule of every day. e.g. 09:00 AM
+    :param schedule_end:
+        The daily active window end time, which is optional. e.g. 05:00 PM
+    :param exclusions:
+        Excluded days compiled by `compile_exclusions`, which is optional. Instances start on these days are skipped
+    :return:
+        A list with all schedule distribution start time string.
+    :raise:
+        ValueError
+    """
+    return list(iter_sub_daily_distributions(
+        range_start_date, range_end_date, minutely_steps, timezone, schedule_start, schedule_end, exclusions
+    ))
+
+
 def get_daily_schedule_distributions(schedule: dict) -> List[dict]:
     return calc_daily_distributions(
         range_start_date=schedule["Range"]["StartDateAt"],
@@ -425,7 +820,8 @@ def get_daily_schedule_distributions(schedule: dict) -> List[dict]:
         daily_steps=schedule["DailyOptions"]["EveryDays"],
         timezone=schedule["TimeZone"]["Name"],
         schedule_start=schedule["StartTime"],
-        schedule_end=schedule.get("EndTime")
+        schedule_end=schedule.get("EndTime"),
+        exclusions=compile_exclusions(schedule.get("Exclusions"))
     )
 
 
@@ -437,7 +833,8 @@ def get_weekly_schedule_distributions(schedule: dict) -> List[dict]:
         weekdays=schedule["WeeklyOptions"]["WeekDays"],
         timezone=schedule["TimeZone"]["Name"],
         schedule_start=schedule["StartTime"],
-        schedule_end=schedule.get("EndTime")
+        schedule_end=schedule.get("EndTime"),
+        exclusions=compile_exclusions(schedule.get("Exclusions"))
     )
 
 
@@ -447,6 +844,7 @@ def get_monthly_schedule_distributions(schedule: dict) -> List[dict]:
     timezone = schedule["TimeZone"]["Name"]
     schedule_start = schedule["StartTime"]
     schedule_end = schedule.get("EndTime")
+    exclusions = compile_exclusions(schedule.get("Exclusions"))
 
     if schedule["MonthlyOptions"]["Type"] == "ByDays":
         by_days_options = schedule["MonthlyOptions"]["ByDays"]
@@ -457,7 +855,8 @@ def get_monthly_schedule_distributions(schedule: dict) -> List[dict]:
             day_of_month=by_days_options["Days"],
             monthly_steps=by_days_options["EveryMonths"],
             schedule_start=schedule_start,
-            schedule_end=schedule_end
+            schedule_end=schedule_end,
+            exclusions=exclusions
         )
     by_weeks_options = schedule["MonthlyOptions"]["ByWeekDays"]
     return calc_monthly_distributions_by_weeks(
@@ -468,10 +867,33 @@ def get_monthly_schedule_distributions(schedule: dict) -> List[dict]:
         weekday=by_weeks_options["WeekDay"],
         monthly_steps=by_weeks_options["EveryMonths"],
         schedule_start=schedule_start,
-        schedule_end=schedule_end
+        schedule_end=schedule_end,
+        exclusions=exclusions
     )
 
 
+def _get_sub_daily_minutely_steps(schedule: dict) -> int:
+    if schedule["Pattern"] == "Hourly":
+        return int(schedule["HourlyOptions"]["EveryHours"]) * 60
+    return int(schedule["MinutelyOptions"]["EveryMinutes"])
+
+
+def iter_sub_daily_schedule_distributions(schedule: dict) -> Iterator[dict]:
+    return iter_sub_daily_distributions(
+        range_start_date=schedule["Range"]["StartDateAt"],
+        range_end_date=schedule["Range"]["EndDateAt"],
+        minutely_steps=_get_sub_daily_minutely_steps(schedule),
+        timezone=schedule["TimeZone"]["Name"],
+        schedule_start=schedule["StartTime"],
+        schedule_end=schedule.get("EndTime"),
+        exclusions=compile_exclusions(schedule.get("Exclusions"))
+    )
+
+
+def get_sub_daily_schedule_distributions(schedule: dict) -> List[dict]:
+    return list(iter_sub_daily_schedule_distributions(schedule))
+
+
 def calc_distributions_by_pattern(schedule: dict) -> List[dict]:
     """
     :param schedule: schedule dict object
@@ -480,6 +902,100 @@ def calc_distributions_by_pattern(schedule: dict) -> List[dict]:
     schedule_pattern_ctrls = {
         "Daily": get_daily_schedule_distributions,
         "Weekly": get_weekly_schedule_distributions,
-        "Monthly": get_monthly_schedule_distributions
+        "Monthly": get_monthly_schedule_distributions,
+        "Hourly": get_sub_daily_schedule_distributions,
+        "Minutely": get_sub_daily_schedule_distributions
     }
-    return schedule_pattern_ctrls[schedule["Pattern"]](schedule) 
\ No newline at end of file
+    return schedule_pattern_ctrls[schedule["Pattern"]](schedule)
+
+
+def iter_distributions_by_pattern(schedule: dict) -> Iterator[dict]:
+    """
+    Lazily calculate the schedule distributions, the sub-daily patterns are generated on demand
+    :param schedule: schedule dict object
+    :return: An iterator of schedule distribution start&end time string.
+    """
+    if schedule["Pattern"] in SUB_DAILY_PATTERNS:
+        return iter_sub_daily_schedule_distributions(schedule)
+    return iter(calc_distributions_by_pattern(schedule))
+
+
+def _get_sunday_based_weekday(day: arrow.Arrow) -> int:
+    return (day.weekday() + 1) % 7  # calendar first weekday is Sunday
+
+
+def _get_schedule_pattern_anchor(schedule: dict, range_start: arrow.Arrow, since: arrow.Arrow) -> arrow.Arrow:
+    # get the start of the latest pattern period which begins on or before `since`
+    if schedule["Pattern"] in SUB_DAILY_PATTERNS:
+        return since.shift(days=-1)  # the window of the day before may go on to `since`
+
+    if schedule["Pattern"] == "Daily":
+        daily_steps = schedule["DailyOptions"]["EveryDays"]
+        return range_start.shift(days=(since - range_start).days // daily_steps * daily_steps)
+
+    if schedule["Pattern"] == "Weekly":
+        weekly_steps = schedule["WeeklyOptions"]["RecursiveEveryWeeks"]
+        first_week_start = range_start.shift(days=-_get_sunday_based_weekday(range_start))
+        weeks = (since - first_week_start).days // 7 // weekly_steps * weekly_steps
+        return first_week_start.shift(weeks=weeks) if weeks else range_start
+
+    monthly_options = schedule["MonthlyOptions"]
+    monthly_steps = monthly_options["ByDays" if monthly_options["Type"] == "ByDays" else "ByWeekDays"]["EveryMonths"]
+    months = (since.year - range_start.year) * 12 + since.month - range_start.month
+    months = months // monthly_steps * monthly_steps
+    return range_start.floor("month").shift(months=months) if months else range_start
+
+
+def calc_distributions_by_pattern_between(
+        schedule: dict,
+        since_date: str,
+        until_date: Optional[str] = None
+) -> List[dict]:
+    """
+    Calculate the schedule distributions whose start date is between `since_date` and `until_date` without
+    expanding the part of the range before `since_date`. The pattern stays anchored at the schedule's own range
+    start, so the result is exactly the matching slice of `calc_distributions_by_pattern(schedule)`.
+    :param schedule: schedule dict object
+    :param since_date:
+        The first start date to keep. e.g. 2022-06-01
+    :param until_date:
+        The last start date to keep, which is optional. Without it every instance from `since_date` on is kept,
+        including the ones the expansion places after the range end date
+    :return:
+        A list with the matched schedule distribution start&end time string.
+    :raise:
+        ValueError
+    """
+    schedule_range = schedule["Range"]
+    timezone = schedule["TimeZone"]["Name"]
+    range_start, range_end = get_schedule_range_time(
+        schedule_range["StartDateAt"], schedule_range["EndDateAt"], timezone
+    )
+    since = get_arrow_time_from_string_with_timezone(since_date, timezone)
+    anchor = range_start
+    if since > range_start:
+        anchor = _get_schedule_pattern_anchor(schedule, range_start, min(since, range_end))
+
+    is_clipped = until_date is not None and until_date < schedule_range["EndDateAt"]
+    windowed_range = {**schedule_range, "StartDateAt": anchor.format("YYYY-MM-DD")}
+    if is_clipped:
+        if until_date < windowed_range["StartDateAt"]:
+            return []
+        windowed_range["EndDateAt"] = until_date
+
+    instances = []
+    for distribution in calc_distributions_by_pattern({**schedule, "Range": windowed_range}):
+        start_date = distribution[START_TIME][:10]
+        if start_date < since_date or (until_date is not None and start_date > until_date):
+            continue
+        if schedule["Pattern"] == "Weekly" and not is_clipped and start_date > schedule_range["EndDateAt"]:
+            # an instance at the midnight right after the range end only exists if the original week walk,
+            # which starts at the range start weekday instead of the anchor's Sunday, reached its week
+            _start = get_arrow_time_from_string_with_timezone(start_date, timezone)
+            _walk_day = _start.shift(
+                days=_get_sunday_based_weekday(range_start) - _get_sunday_based_weekday(_start)
+            )
+            if _walk_day > range_end.shift(days=6):
+                continue
+        instances.append(distribution)
+    return instances
\ No newline at end of file
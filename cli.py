@@ -3,9 +3,15 @@
 Command line interface for ScheduleGenerator
 """
 
+import asyncio
+import cProfile
+import io
 import json
+import pstats
 import sys
-from typing import Dict, Any
+import time
+import tracemalloc
+from typing import Dict, Any, List
 
 from schedule_generator import (
     calc_daily,
@@ -14,6 +20,7 @@ from schedule_generator import (
     calc_monthly_by_weeks,
     calc_dist_by_pattern,
 )
+from schedule_generator.server import DEFAULT_HOST, DEFAULT_PORT, ScheduleServer
 
 
 def print_usage():
@@ -27,6 +34,8 @@ ScheduleGenerator - 周期事件时间分布计算器
     python cli.py monthly-days <start_date> <end_date> <timezone> <day_of_month> <monthly_steps> <start_time> [end_time]
     python cli.py monthly-weeks <start_date> <end_date> <timezone> <week_ordinal> <weekday> <monthly_steps> <start_time> [end_time]
     python cli.py pattern <config_file>
+    python cli.py profile [--top <n>] [--pstats <output_file>] <command> <args...>
+    python cli.py serve [host] [port]
 
 示例:
     python cli.py daily 2022-05-01 2022-05-31 3 "Asia/Shanghai" "08:30 PM" "11:00 PM"
@@ -34,6 +43,8 @@ ScheduleGenerator - 周期事件时间分布计算器
     python cli.py monthly-days 2022-05-01 2022-08-31 "Asia/Shanghai" 15 1 "02:00 PM"
     python cli.py monthly-weeks 2022-05-01 2022-07-31 "Asia/Shanghai" "First" "Monday" 1 "03:00 PM"
     python cli.py pattern config.json
+    python cli.py profile --top 10 --pstats pattern.pstats pattern config.json
+    python cli.py serve 127.0.0.1 8765
 """)
 
 
@@ -42,131 +53,208 @@ def parse_weekdays(weekdays_str: str) -> list[str]:
     return [day.strip() for day in weekdays_str.split(",")]
 
 
+def run_command(argv: List[str]) -> List[dict]:
+    """执行计算命令并返回周期事件列表，argv 为命令及其参数"""
+    argv = ["cli.py"] + argv  # 保持与 sys.argv 相同的参数位置
+    command = argv[1]
+
+    if command == "daily":
+        if len(argv) < 7:
+            print("错误: 每日模式需要至少6个参数")
+            print_usage()
+            sys.exit(1)
+        
+        start_date = argv[2]
+        end_date = argv[3]
+        daily_steps = int(argv[4])
+        timezone = argv[5]
+        start_time = argv[6]
+        end_time = argv[7] if len(argv) > 7 else None
+        
+        result = calc_daily(
+            range_start_date=start_date,
+            range_end_date=end_date,
+            daily_steps=daily_steps,
+            timezone=timezone,
+            schedule_start=start_time,
+            schedule_end=end_time
+        )
+        
+    elif command == "weekly":
+        if len(argv) < 7:
+            print("错误: 每周模式需要至少7个参数")
+            print_usage()
+            sys.exit(1)
+        
+        start_date = argv[2]
+        end_date = argv[3]
+        weekly_steps = int(argv[4])
+        weekdays = parse_weekdays(argv[5])
+        timezone = argv[6]
+        start_time = argv[7]
+        end_time = argv[8] if len(argv) > 8 else None
+        
+        result = calc_weekly(
+            range_start_date=start_date,
+            range_end_date=end_date,
+            weekly_steps=weekly_steps,
+            weekdays=weekdays,
+            timezone=timezone,
+            schedule_start=start_time,
+            schedule_end=end_time
+        )
+        
+    elif command == "monthly-days":
+        if len(argv) < 7:
+            print("错误: 每月按天数模式需要至少7个参数")
+            print_usage()
+            sys.exit(1)
+        
+        start_date = argv[2]
+        end_date = argv[3]
+        timezone = argv[4]
+        day_of_month = int(argv[5])
+        monthly_steps = int(argv[6])
+        start_time = argv[7]
+        end_time = argv[8] if len(argv) > 8 else None
+        
+        result = calc_monthly_by_days(
+            range_start_date=start_date,
+            range_end_date=end_date,
+            timezone=timezone,
+            day_of_month=day_of_month,
+            monthly_steps=monthly_steps,
+            schedule_start=start_time,
+            schedule_end=end_time
+        )
+        
+    elif command == "monthly-weeks":
+        if len(argv) < 8:
+            print("错误: 每月按周几模式需要至少8个参数")
+            print_usage()
+            sys.exit(1)
+        
+        start_date = argv[2]
+        end_date = argv[3]
+        timezone = argv[4]
+        week_ordinal = argv[5]
+        weekday = argv[6]
+        monthly_steps = int(argv[7])
+        start_time = argv[8]
+        end_time = argv[9] if len(argv) > 9 else None
+        
+        result = calc_monthly_by_weeks(
+            range_start_date=start_date,
+            range_end_date=end_date,
+            timezone=timezone,
+            week_ordinal=week_ordinal,
+            weekday=weekday,
+            monthly_steps=monthly_steps,
+            schedule_start=start_time,
+            schedule_end=end_time
+        )
+        
+    elif command == "pattern":
+        if len(argv) < 3:
+            print("错误: 模式配置需要配置文件路径")
+            print_usage()
+            sys.exit(1)
+        
+        config_file = argv[2]
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        
+        result = calc_dist_by_pattern(config)
+        
+    else:
+        print(f"错误: 未知命令 '{command}'")
+        print_usage()
+        sys.exit(1)
+
+    return result
+
+
+def _get_profile_options(argv: List[str]) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"top": 20, "pstats": None}
+    while argv and argv[0] in ("--top", "--pstats"):
+        if len(argv) < 2:
+            raise ValueError(f"{argv[0]} 需要一个参数")
+        options[argv[0][2:]] = int(argv[1]) if argv[0] == "--top" else argv[1]
+        argv = argv[2:]
+    options["argv"] = argv
+    return options
+
+
+def run_profile(argv: List[str]) -> str:
+    """在 cProfile 和 tracemalloc 下执行计算命令，返回性能分析报告"""
+    options = _get_profile_options(argv)
+    if not options["argv"] or options["argv"][0] == "profile":
+        raise ValueError("性能分析需要一个计算命令")
+
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    profiler.enable()
+    try:
+        result = run_command(options["argv"])
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started_at
+        snapshot = tracemalloc.take_snapshot()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    if options["pstats"]:
+        profiler.dump_stats(options["pstats"])
+
+    report = io.StringIO()
+    report.write(f"周期事件数量: {len(result)}\n")
+    report.write(f"耗时: {elapsed:.4f} 秒 (包含 cProfile 和 tracemalloc 的开销)\n")
+    report.write(f"每秒周期事件数: {len(result) / elapsed if elapsed else 0:.0f}\n")
+    report.write(f"内存峰值: {peak_memory / 1024:.1f} KiB\n")
+
+    report.write(f"\n按累计耗时排序的前 {options['top']} 个函数:\n")
+    pstats.Stats(profiler, stream=report).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(options["top"])
+
+    report.write(f"按分配内存排序的前 {options['top']} 个代码行:\n")
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    for statistic in snapshot.statistics("lineno")[:options["top"]]:
+        report.write(f"    {statistic}\n")
+    if options["pstats"]:
+        report.write(f"\npstats 文件已写入: {options['pstats']}\n")
+    return report.getvalue()
+
+
+async def run_server(host: str, port: int) -> None:
+    """启动本地服务，以 JSON 行的形式接收周期事件配置并分块返回计算结果"""
+    async with ScheduleServer(host, port) as server:
+        print(f"服务已启动: {server.host}:{server.port}")
+        await server.serve_forever()
+
+
 def main():
     """主函数"""
     if len(sys.argv) < 2:
         print_usage()
         sys.exit(1)
 
-    command = sys.argv[1]
-
     try:
-        if command == "daily":
-            if len(sys.argv) < 7:
-                print("错误: 每日模式需要至少6个参数")
-                print_usage()
-                sys.exit(1)
-            
-            start_date = sys.argv[2]
-            end_date = sys.argv[3]
-            daily_steps = int(sys.argv[4])
-            timezone = sys.argv[5]
-            start_time = sys.argv[6]
-            end_time = sys.argv[7] if len(sys.argv) > 7 else None
-            
-            result = calc_daily(
-                range_start_date=start_date,
-                range_end_date=end_date,
-                daily_steps=daily_steps,
-                timezone=timezone,
-                appointment_start=start_time,
-                appointment_end=end_time
-            )
-            
-        elif command == "weekly":
-            if len(sys.argv) < 7:
-                print("错误: 每周模式需要至少7个参数")
-                print_usage()
-                sys.exit(1)
-            
-            start_date = sys.argv[2]
-            end_date = sys.argv[3]
-            weekly_steps = int(sys.argv[4])
-            weekdays = parse_weekdays(sys.argv[5])
-            timezone = sys.argv[6]
-            start_time = sys.argv[7]
-            end_time = sys.argv[8] if len(sys.argv) > 8 else None
-            
-            result = calc_weekly(
-                range_start_date=start_date,
-                range_end_date=end_date,
-                weekly_steps=weekly_steps,
-                weekdays=weekdays,
-                timezone=timezone,
-                appointment_start=start_time,
-                appointment_end=end_time
-            )
-            
-        elif command == "monthly-days":
-            if len(sys.argv) < 7:
-                print("错误: 每月按天数模式需要至少7个参数")
-                print_usage()
-                sys.exit(1)
-            
-            start_date = sys.argv[2]
-            end_date = sys.argv[3]
-            timezone = sys.argv[4]
-            day_of_month = int(sys.argv[5])
-            monthly_steps = int(sys.argv[6])
-            start_time = sys.argv[7]
-            end_time = sys.argv[8] if len(sys.argv) > 8 else None
-            
-            result = calc_monthly_by_days(
-                range_start_date=start_date,
-                range_end_date=end_date,
-                timezone=timezone,
-                day_of_month=day_of_month,
-                monthly_steps=monthly_steps,
-                appointment_start=start_time,
-                appointment_end=end_time
-            )
-            
-        elif command == "monthly-weeks":
-            if len(sys.argv) < 8:
-                print("错误: 每月按周几模式需要至少8个参数")
-                print_usage()
-                sys.exit(1)
-            
-            start_date = sys.argv[2]
-            end_date = sys.argv[3]
-            timezone = sys.argv[4]
-            week_ordinal = sys.argv[5]
-            weekday = sys.argv[6]
-            monthly_steps = int(sys.argv[7])
-            start_time = sys.argv[8]
-            end_time = sys.argv[9] if len(sys.argv) > 9 else None
-            
-            result = calc_monthly_by_weeks(
-                range_start_date=start_date,
-                range_end_date=end_date,
-                timezone=timezone,
-                week_ordinal=week_ordinal,
-                weekday=weekday,
-                monthly_steps=monthly_steps,
-                appointment_start=start_time,
-                appointment_end=end_time
-            )
-            
-        elif command == "pattern":
-            if len(sys.argv) < 3:
-                print("错误: 模式配置需要配置文件路径")
-                print_usage()
-                sys.exit(1)
-            
-            config_file = sys.argv[2]
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            
-            result = calc_dist_by_pattern(config)
-            
-        else:
-            print(f"错误: 未知命令 '{command}'")
-            print_usage()
-            sys.exit(1)
-        
+        if sys.argv[1] == "profile":
+            print(run_profile(sys.argv[2:]))
+            return
+        if sys.argv[1] == "serve":
+            host = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_HOST
+            port = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_PORT
+            try:
+                asyncio.run(run_server(host, port))
+            except KeyboardInterrupt:
+                print("服务已停止")
+            return
+        result = run_command(sys.argv[1:])
+
         # 输出结果
         print(json.dumps(result, indent=2, ensure_ascii=False))
-        
+
     except Exception as e:
         print(f"错误: {e}")
         sys.exit(1)
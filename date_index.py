@@ -0,0 +1,237 @@
+import calendar
+import datetime
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from dateutil import tz as dateutil_tz
+
+from .calculator import (
+    HOUR,
+    MINUTE,
+    MINUTES_OF_DAY,
+    SUB_DAILY_PATTERNS,
+    WEEK_DAYS_KEYWORDS,
+    WEEKDAYS,
+    get_schedule_ranges,
+    get_sub_daily_period_days,
+    get_sub_daily_slots,
+)
+from .exclusions import ExclusionDays, compile_exclusions
+
+DAILY = "Daily"
+WEEKLY = "Weekly"
+BY_DAYS = "ByDays"
+BY_WEEK_DAYS = "ByWeekDays"
+SUB_DAILY = "SubDaily"
+
+
+class _IndexedSchedule(NamedTuple):
+    kind: str
+    steps: int  # the days the sub-daily start times repeat after for the sub-daily schedules
+    keys: List[tuple]
+    start_ordinal: int
+    end_ordinal: int
+    hour: int
+    minute: int
+    timezone: str
+    exclusions: Optional[ExclusionDays]
+    slots: Tuple[Tuple[int, int, int], ...] = ()  # (day offset, hour, minute) of the sub-daily start times of a period
+
+
+def _get_month_index(date: datetime.date) -> int:
+    return date.year * 12 + date.month - 1
+
+
+def _get_sunday_based_weekday(ordinal: int) -> int:
+    return ordinal % 7  # ordinal 7 is Sunday 0001-01-07
+
+
+def _get_week_index(ordinal: int) -> int:
+    return ordinal // 7  # weeks start on Sunday like the calendar of the calculator
+
+
+class ScheduleDateIndex:
+    """
+    Index of schedule definitions answering which schedules have an instance on a date without expanding them.
+    Daily schedules are bucketed by the range start day modulo the steps, weekly schedules by weekday and week
+    modulo the steps, monthly schedules by month modulo the steps and day of month or weekday ordinal.
+    Sub-daily schedules can have an instance on any day of their range, so they are always checked.
+    """
+
+    def __init__(self) -> None:
+        self._schedules: Dict[str, _IndexedSchedule] = {}
+        self._buckets: Dict[tuple, Set[str]] = defaultdict(set)
+        self._steps: Dict[str, Counter] = defaultdict(Counter)  # every distinct steps need its own bucket lookup
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    def __contains__(self, schedule_id: str) -> bool:
+        return schedule_id in self._schedules
+
+    def insert(self, schedule_id: str, schedule: dict) -> None:
+        """
+        Insert or replace a schedule
+        :param schedule_id: the schedule id
+        :param schedule: schedule dict object
+        :raise:
+            ValueError
+        """
+        range_start = datetime.date.fromisoformat(schedule["Range"]["StartDateAt"])
+        range_end = datetime.date.fromisoformat(schedule["Range"]["EndDateAt"])
+        if range_start > range_end:
+            raise ValueError("Range start date is bigger than range end date")
+        start_ordinal = range_start.toordinal()
+
+        keys: List[tuple] = []
+        slots: Tuple[Tuple[int, int, int], ...] = ()
+        if schedule["Pattern"] in SUB_DAILY_PATTERNS:
+            minutely_steps = schedule["HourlyOptions"]["EveryHours"] * 60 if schedule["Pattern"] == "Hourly" \
+                else schedule["MinutelyOptions"]["EveryMinutes"]
+            kind, steps = SUB_DAILY, get_sub_daily_period_days(minutely_steps, schedule.get("EndTime"))
+            keys = [(kind,)]
+            slots = tuple(get_sub_daily_slots(minutely_steps, schedule["StartTime"], schedule.get("EndTime")))
+        elif schedule["Pattern"] == "Daily":
+            kind, steps = DAILY, schedule["DailyOptions"]["EveryDays"]
+            keys = [(kind, steps, start_ordinal % steps)]
+        elif schedule["Pattern"] == "Weekly":
+            kind, steps = WEEKLY, schedule["WeeklyOptions"]["RecursiveEveryWeeks"]
+            week_phase = _get_week_index(start_ordinal) % steps
+            keys = [(kind, steps, week_phase, WEEKDAYS[weekday]) for weekday in schedule["WeeklyOptions"]["WeekDays"]]
+        elif schedule["MonthlyOptions"]["Type"] == "ByDays":
+            kind, steps = BY_DAYS, schedule["MonthlyOptions"]["ByDays"]["EveryMonths"]
+            month_phase = _get_month_index(range_start) % steps
+            keys = [(kind, steps, month_phase, schedule["MonthlyOptions"]["ByDays"]["Days"])]
+        else:
+            by_weeks_options = schedule["MonthlyOptions"]["ByWeekDays"]
+            kind, steps = BY_WEEK_DAYS, by_weeks_options["EveryMonths"]
+            month_phase = _get_month_index(range_start) % steps
+            keys = [(
+                kind, steps, month_phase, WEEKDAYS[by_weeks_options["WeekDay"]],
+                WEEK_DAYS_KEYWORDS[by_weeks_options["Ordinal"]]
+            )]
+
+        schedule_start, _ = get_schedule_ranges(schedule["StartTime"])
+        self.remove(schedule_id)
+        self._schedules[schedule_id] = _IndexedSchedule(
+            kind=kind,
+            steps=steps,
+            keys=keys,
+            start_ordinal=start_ordinal,
+            end_ordinal=range_end.toordinal(),
+            hour=schedule_start[HOUR],
+            minute=schedule_start[MINUTE],
+            timezone=schedule["TimeZone"]["Name"],
+            exclusions=compile_exclusions(schedule.get("Exclusions")),
+            slots=slots,
+        )
+        for key in keys:
+            self._buckets[key].add(schedule_id)
+        self._steps[kind][steps] += 1
+
+    def remove(self, schedule_id: str) -> None:
+        """
+        Remove a schedule
+        :param schedule_id: the schedule id
+        """
+        indexed = self._schedules.pop(schedule_id, None)
+        if indexed is None:
+            return
+        for key in indexed.keys:
+            self._buckets[key].discard(schedule_id)
+            if not self._buckets[key]:
+                del self._buckets[key]
+        self._steps[indexed.kind][indexed.steps] -= 1
+        if not self._steps[indexed.kind][indexed.steps]:
+            del self._steps[indexed.kind][indexed.steps]
+
+    def _get_candidate_keys(self, date: datetime.date) -> List[tuple]:
+        ordinal = date.toordinal()
+        month_index = _get_month_index(date)
+        weekday = _get_sunday_based_weekday(ordinal)
+        _, month_max_days = calendar.monthrange(date.year, date.month)
+
+        # a day of month bigger than the month length falls on the last day of the month
+        month_days = [date.day] + (list(range(date.day + 1, 32)) if date.day == month_max_days else [])
+        week_ordinals = [(date.day - 1) // 7] if date.day <= 28 else []
+        if date.day + 7 > month_max_days:
+            week_ordinals.append(WEEK_DAYS_KEYWORDS["Last"])
+
+        keys: List[tuple] = [(SUB_DAILY,)] if self._steps[SUB_DAILY] else []
+        keys.extend((DAILY, steps, ordinal % steps) for steps in self._steps[DAILY])
+        keys.extend((WEEKLY, steps, _get_week_index(ordinal) % steps, weekday) for steps in self._steps[WEEKLY])
+        for steps in self._steps[BY_DAYS]:
+            keys.extend((BY_DAYS, steps, month_index % steps, month_day) for month_day in month_days)
+        for steps in self._steps[BY_WEEK_DAYS]:
+            keys.extend(
+                (BY_WEEK_DAYS, steps, month_index % steps, weekday, week_ordinal) for week_ordinal in week_ordinals
+            )
+        return keys
+
+    def _is_in_range(self, indexed: _IndexedSchedule, ordinal: int) -> bool:
+        if indexed.start_ordinal <= ordinal <= indexed.end_ordinal:
+            return True
+        # the calculator keeps an instance at the midnight right after the range end, except the daily walk
+        # which stops at the range end, and the weekly walk which only reaches the week if the range start
+        # weekday of it is not later than 6 days after the range end
+        if ordinal != indexed.end_ordinal + 1 or indexed.hour or indexed.minute or indexed.kind == DAILY:
+            return False
+        if indexed.kind == WEEKLY:
+            walk_ordinal = ordinal - _get_sunday_based_weekday(ordinal) + \
+                _get_sunday_based_weekday(indexed.start_ordinal)
+            return walk_ordinal <= indexed.end_ordinal + 6
+        return True
+
+    def _get_start_hour(self, indexed: _IndexedSchedule, date: datetime.date) -> int:
+        _start = datetime.datetime(date.year, date.month, date.day, indexed.hour, indexed.minute,
+                                   tzinfo=dateutil_tz.gettz(indexed.timezone))
+        # a start in the DST gap is moved forward like Arrow does
+        _resolved: datetime.datetime = dateutil_tz.resolve_imaginary(_start)
+        return _resolved.hour
+
+    def _has_sub_daily_instance(self, indexed: _IndexedSchedule, date: datetime.date, hour: Optional[int]) -> bool:
+        # the schedules go on until the window start of the day after the range end, so it may also count
+        ordinal = date.toordinal()
+        tzinfo = dateutil_tz.gettz(indexed.timezone)
+        window_start = indexed.hour * 60 + indexed.minute
+        for day_offset, _hour, _minute in indexed.slots:
+            period_ordinal = ordinal - day_offset
+            if period_ordinal < indexed.start_ordinal or (period_ordinal - indexed.start_ordinal) % indexed.steps:
+                continue
+            minutes_limit = (indexed.end_ordinal + 1 - period_ordinal) * MINUTES_OF_DAY + window_start
+            if day_offset * MINUTES_OF_DAY + _hour * 60 + _minute >= minutes_limit:
+                continue
+            if hour is not None and _hour != hour:
+                continue
+            _start = datetime.datetime(date.year, date.month, date.day, _hour, _minute, tzinfo=tzinfo)
+            if dateutil_tz.datetime_exists(_start):  # a start in the DST gap is skipped like the calculator does
+                return True
+        return False
+
+    def get_schedules_by_date(self, date: str, hour: Optional[int] = None) -> Set[str]:
+        """
+        Get the schedules which have an instance starting on a date
+        :param date: the date. e.g. 2022-05-18
+        :param hour: the hour of the instance start time, which is optional. e.g. 20
+        :return: the set of schedule ids
+        """
+        _date = datetime.date.fromisoformat(date)
+        ordinal = _date.toordinal()
+
+        schedule_ids = set()
+        for key in self._get_candidate_keys(_date):
+            for schedule_id in self._buckets.get(key, ()):
+                indexed = self._schedules[schedule_id]
+                if indexed.kind == SUB_DAILY:
+                    if not (indexed.exclusions and ordinal in indexed.exclusions) and \
+                            self._has_sub_daily_instance(indexed, _date, hour):
+                        schedule_ids.add(schedule_id)
+                    continue
+                if not self._is_in_range(indexed, ordinal):
+                    continue
+                if indexed.exclusions and ordinal in indexed.exclusions:
+                    continue
+                if hour is not None and self._get_start_hour(indexed, _date) != hour:
+                    continue
+                schedule_ids.add(schedule_id)
+        return schedule_ids
@@ -0,0 +1,68 @@
+import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# named exclusion calendars which schedules can refer to by `Exclusions.Calendars`
+EXCLUSION_CALENDARS: Dict[str, Tuple[str, ...]] = {}
+
+
+class ExclusionDays:
+    """
+    Excluded days compiled to a bitset indexed by the day ordinal, so checking a day is a single bit lookup
+    """
+
+    def __init__(self, dates: Iterable[str]):
+        ordinals = [datetime.date.fromisoformat(date).toordinal() for date in dates]
+        self.first_ordinal = min(ordinals) if ordinals else 0
+        self.last_ordinal = max(ordinals) if ordinals else -1
+        self._bits = bytearray((self.last_ordinal - self.first_ordinal) // 8 + 1)
+        for ordinal in ordinals:
+            offset = ordinal - self.first_ordinal
+            self._bits[offset >> 3] |= 1 << (offset & 7)
+
+    def __contains__(self, ordinal: int) -> bool:
+        if ordinal < self.first_ordinal or ordinal > self.last_ordinal:
+            return False
+        offset = ordinal - self.first_ordinal
+        return bool(self._bits[offset >> 3] & (1 << (offset & 7)))
+
+    def __bool__(self) -> bool:
+        return self.last_ordinal >= self.first_ordinal
+
+
+def register_exclusion_calendar(name: str, dates: List[str]) -> None:
+    """
+    Register or replace a named exclusion calendar, e.g. the public holidays of a region
+    :param name: calendar name. e.g. CN-Holidays
+    :param dates: excluded dates. e.g. ['2022-10-01', '2022-10-02']
+    """
+    EXCLUSION_CALENDARS[name] = tuple(dates)
+    _compile_exclusion_days.cache_clear()
+
+
+@lru_cache(maxsize=128)
+def _compile_exclusion_days(dates: Tuple[str, ...], calendars: Tuple[str, ...]) -> ExclusionDays:
+    excluded_dates = set(dates)
+    for calendar_name in calendars:
+        if calendar_name not in EXCLUSION_CALENDARS:
+            raise ValueError(f"Unknown exclusion calendar: {calendar_name}")
+        excluded_dates.update(EXCLUSION_CALENDARS[calendar_name])
+    return ExclusionDays(excluded_dates)
+
+
+def compile_exclusions(exclusions: Optional[dict]) -> Optional[ExclusionDays]:
+    """
+    Compile the `Exclusions` options of a schedule, the same options share one compiled bitset
+    :param exclusions:
+        Exclusions options. e.g. {"Dates": ["2022-05-04"], "Calendars": ["CN-Holidays"]}
+    :return:
+        The compiled excluded days, or None when nothing is excluded
+    :raise:
+        ValueError
+    """
+    if not exclusions:
+        return None
+    excluded_days = _compile_exclusion_days(
+        tuple(sorted(exclusions.get("Dates", []))), tuple(sorted(exclusions.get("Calendars", [])))
+    )
+    return excluded_days if excluded_days else None
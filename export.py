@@ -0,0 +1,249 @@
+import datetime
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .calculator import END_TIME, START_TIME, calc_distributions_by_pattern, get_day_utc_offsets, iter_wall_time_epochs
+from .store import StoredDistributions
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None
+
+SCHEDULE_ID = "schedule_id"
+START = "start"
+END = "end"
+
+DEFAULT_BATCH_ROWS = 65536
+
+_UNIX_EPOCH = datetime.date(1970, 1, 1)
+
+Distributions = Union[List[dict], StoredDistributions]
+
+
+def _require(module: Any, name: str) -> None:
+    if np is None or module is None:
+        raise ImportError(f"{name} and numpy are required to export distributions, "
+                          f"install them by `pip install schedule-generator[{name}]`")
+
+
+def _concatenate(segments: List[Any]) -> Any:
+    if len(segments) == 1:
+        return segments[0]  # a single segment is used as it is, without copying
+    return np.concatenate(segments) if segments else np.empty(0, np.int64)
+
+
+def _get_epochs(time_strings: List[str], timezone: str) -> Any:
+    # the wall clock times are parsed by numpy, and the UTC offset of their day is subtracted
+    epochs = np.array(time_strings, dtype="datetime64[s]").view(np.int64)
+    if not len(epochs):
+        return epochs
+    days = epochs // 86400
+    first_day, last_day = int(days.min()), int(days.max())
+    offsets = get_day_utc_offsets(
+        timezone, _UNIX_EPOCH + datetime.timedelta(days=first_day), _UNIX_EPOCH + datetime.timedelta(days=last_day)
+    )
+    day_offsets = np.array([offset or 0 for offset in offsets], dtype=np.int64)
+    epochs -= day_offsets[days - first_day]
+
+    # the times on the days the UTC offset changes are converted one by one
+    changing_days = np.array([offset is None for offset in offsets])
+    changing = np.flatnonzero(changing_days[days - first_day])
+    if len(changing):
+        epochs[changing] = list(iter_wall_time_epochs([time_strings[i] for i in changing], timezone))
+    return epochs
+
+
+class _EpochColumns:
+    # int64 epoch seconds columns of many schedules, kept as buffer segments until a table is built
+
+    def __init__(self) -> None:
+        self.schedule_ids: List[str] = []
+        self.counts: List[int] = []
+        self.start_segments: List[Any] = []
+        self.end_segments: List[Any] = []
+
+    def __len__(self) -> int:
+        return sum(self.counts)
+
+    def append(self, schedule_id: str, schedule: dict, distributions: Optional[Distributions] = None) -> None:
+        if distributions is None:
+            distributions = calc_distributions_by_pattern(schedule)
+        if isinstance(distributions, StoredDistributions):
+            # views of the memory-mapped columns, no copy
+            start_times = np.frombuffer(distributions.start_times, dtype=np.int64)
+            end_times = np.frombuffer(distributions.end_times, dtype=np.int64) \
+                if distributions.end_times is not None else None
+        else:
+            timezone = schedule["TimeZone"]["Name"]
+            start_times = _get_epochs([d[START_TIME] for d in distributions], timezone)
+            end_times = _get_epochs([d[END_TIME] for d in distributions], timezone) \
+                if distributions and END_TIME in distributions[0] else None
+
+        count = len(start_times)
+        self.schedule_ids.append(schedule_id)
+        self.counts.append(count)
+        self.start_segments.append(start_times)
+        self.end_segments.append(end_times if end_times is not None else count)
+
+    def get_columns(self) -> Tuple[Any, Any, Any, Any]:
+        # return schedule id codes, start times, end times and the end time validity mask
+        codes = np.repeat(np.arange(len(self.schedule_ids), dtype=np.int32), self.counts)
+        start_times = _concatenate(self.start_segments)
+        if all(not isinstance(segment, int) for segment in self.end_segments):
+            return codes, start_times, _concatenate(self.end_segments), None
+
+        # the schedules without end time are filled with null end times
+        end_times = _concatenate([
+            np.zeros(segment, np.int64) if isinstance(segment, int) else segment for segment in self.end_segments
+        ])
+        end_valid = np.concatenate([
+            np.full(segment, False) if isinstance(segment, int) else np.full(len(segment), True)
+            for segment in self.end_segments
+        ])
+        return codes, start_times, end_times, end_valid
+
+
+def _build_dataframe(columns: _EpochColumns, timezone: str) -> "pd.DataFrame":
+    codes, start_times, end_times, end_valid = columns.get_columns()
+
+    def get_timestamps(epochs: Any) -> Any:
+        # view the epoch seconds as datetime64 without copying and attach the timezone
+        return pd.DatetimeIndex(epochs.view("datetime64[s]")).tz_localize("UTC").tz_convert(timezone)
+
+    end_column = get_timestamps(end_times)
+    if end_valid is not None:
+        end_column = end_column.where(end_valid)
+    return pd.DataFrame({
+        SCHEDULE_ID: pd.Categorical.from_codes(codes, categories=columns.schedule_ids),
+        START: get_timestamps(start_times),
+        END: end_column,
+    })
+
+
+def _build_record_batch(columns: _EpochColumns, timezone: str) -> "pa.RecordBatch":
+    codes, start_times, end_times, end_valid = columns.get_columns()
+    timestamp_type = pa.timestamp("s", tz=timezone)
+
+    def get_timestamps(epochs: Any, valid: Any = None) -> "pa.Array":
+        # wrap the int64 epoch buffer as the timestamp array data buffer without copying
+        validity = pa.py_buffer(np.packbits(valid, bitorder="little")) if valid is not None else None
+        return pa.Array.from_buffers(timestamp_type, len(epochs), [validity, pa.py_buffer(epochs)])
+
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.DictionaryArray.from_arrays(pa.array(codes), pa.array(columns.schedule_ids, pa.string())),
+            get_timestamps(start_times),
+            get_timestamps(end_times, end_valid),
+        ],
+        names=[SCHEDULE_ID, START, END],
+    )
+
+
+def to_dataframe(
+        schedule_id: str,
+        schedule: dict,
+        distributions: Optional[Distributions] = None,
+        timezone: Optional[str] = None
+) -> "pd.DataFrame":
+    """
+    Export the distributions of a schedule to a pandas DataFrame with timezone aware `start` and `end` columns
+    :param schedule_id: the schedule id, which fills the `schedule_id` column
+    :param schedule: schedule dict object
+    :param distributions:
+        The calculated distributions or stored distributions of the schedule, which is optional.
+        The schedule is calculated when it is not provided
+    :param timezone: timezone of the timestamp columns, which is optional. Defaults to the schedule's timezone
+    :return: pandas DataFrame
+    :raise:
+        ImportError, ValueError
+    """
+    _require(pd, "pandas")
+    columns = _EpochColumns()
+    columns.append(schedule_id, schedule, distributions)
+    return _build_dataframe(columns, timezone or schedule["TimeZone"]["Name"])
+
+
+def to_arrow_table(
+        schedule_id: str,
+        schedule: dict,
+        distributions: Optional[Distributions] = None,
+        timezone: Optional[str] = None
+) -> "pa.Table":
+    """
+    Export the distributions of a schedule to a pyarrow Table with timezone aware `start` and `end` columns
+    :param schedule_id: the schedule id, which fills the `schedule_id` column
+    :param schedule: schedule dict object
+    :param distributions:
+        The calculated distributions or stored distributions of the schedule, which is optional.
+        The schedule is calculated when it is not provided. The columns of stored distributions are wrapped
+        without copying, so the table has to be released before they are closed
+    :param timezone: timezone of the timestamp columns, which is optional. Defaults to the schedule's timezone
+    :return: pyarrow Table
+    :raise:
+        ImportError, ValueError
+    """
+    _require(pa, "pyarrow")
+    columns = _EpochColumns()
+    columns.append(schedule_id, schedule, distributions)
+    return pa.Table.from_batches([_build_record_batch(columns, timezone or schedule["TimeZone"]["Name"])])
+
+
+def _iter_epoch_columns(schedules: Iterable[Tuple[str, dict]], batch_rows: int) -> Iterator[_EpochColumns]:
+    columns = _EpochColumns()
+    for schedule_id, schedule in schedules:
+        columns.append(schedule_id, schedule)
+        if len(columns) >= batch_rows:
+            yield columns
+            columns = _EpochColumns()
+    if columns.schedule_ids:
+        yield columns
+
+
+def iter_record_batches(
+        schedules: Iterable[Tuple[str, dict]],
+        timezone: str = "UTC",
+        batch_rows: int = DEFAULT_BATCH_ROWS
+) -> Iterator["pa.RecordBatch"]:
+    """
+    Calculate many schedules and export them as pyarrow record batches, a batch is emitted as soon as it holds
+    at least `batch_rows` rows, the instances of one schedule are never split between batches
+    :param schedules: (schedule id, schedule dict object) pairs
+    :param timezone: timezone of the timestamp columns. e.g. UTC
+    :param batch_rows: the row count to emit a batch at
+    :return: iterator of pyarrow RecordBatch
+    :raise:
+        ImportError, ValueError
+    """
+    _require(pa, "pyarrow")
+    for columns in _iter_epoch_columns(schedules, batch_rows):
+        yield _build_record_batch(columns, timezone)
+
+
+def iter_dataframes(
+        schedules: Iterable[Tuple[str, dict]],
+        timezone: str = "UTC",
+        batch_rows: int = DEFAULT_BATCH_ROWS
+) -> Iterator["pd.DataFrame"]:
+    """
+    Calculate many schedules and export them as pandas DataFrames, a DataFrame is emitted as soon as it holds
+    at least `batch_rows` rows, the instances of one schedule are never split between DataFrames
+    :param schedules: (schedule id, schedule dict object) pairs
+    :param timezone: timezone of the timestamp columns. e.g. UTC
+    :param batch_rows: the row count to emit a DataFrame at
+    :return: iterator of pandas DataFrame
+    :raise:
+        ImportError, ValueError
+    """
+    _require(pd, "pandas")
+    for columns in _iter_epoch_columns(schedules, batch_rows):
+        yield _build_dataframe(columns, timezone)
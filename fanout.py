@@ -0,0 +1,100 @@
+import datetime
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from dateutil import tz as dateutil_tz
+
+from .calculator import (
+    END_TIME,
+    START_TIME,
+    SUB_DAILY_PATTERNS,
+    WALL_TIME_FORMAT,
+    calc_distributions_by_pattern,
+    get_timezone_gaps,
+)
+
+TIMEZONE = "timezone"
+REFERENCE_TIMEZONE = "UTC"
+
+
+def _localize_distributions(
+        reference: List[dict],
+        instance_dates: Dict[str, List[Tuple[int, str, bool]]],
+        gaps: List[Tuple[str, str, datetime.timedelta]],
+        is_sub_daily: bool = False
+) -> List[dict]:
+    instances = [dict(distribution) for distribution in reference]
+    dropped = set()
+    for gap_start, gap_end, gap_length in gaps:
+        candidates = instance_dates.get(gap_start[:10], [])
+        if gap_end[:10] != gap_start[:10]:
+            candidates = candidates + instance_dates.get(gap_end[:10], [])
+        for i, key, is_crossed_end in candidates:
+            wall_time = instances[i][key]
+            if is_crossed_end:
+                # a cross-day end time is shifted to the start day first and then moved 1 day later,
+                # so a gap on the start day moves it too
+                wall_time = reference[i][START_TIME][:10] + wall_time[10:]
+            if not gap_start <= wall_time < gap_end:
+                continue
+            if is_sub_daily:
+                dropped.add(i)  # a sub-daily slot which doesn't exist is skipped like the calculator does
+            else:  # the wall time doesn't exist, move it forward like Arrow does
+                _wall_time = datetime.datetime.strptime(instances[i][key], WALL_TIME_FORMAT) + gap_length
+                instances[i][key] = _wall_time.strftime(WALL_TIME_FORMAT)
+    if dropped:
+        return [distribution for i, distribution in enumerate(instances) if i not in dropped]
+    return instances
+
+
+def calc_distributions_by_pattern_for_timezones(schedule: dict, timezones: Iterable[str]) -> Dict[str, List[dict]]:
+    """
+    Calculate the schedule distributions of one schedule definition in many timezones. The wall clock instances
+    are calculated once, then every timezone only moves the instances which fall into its DST gaps, the sub-daily
+    instances falling into them are dropped instead.
+    The result for each timezone is the same as `calc_distributions_by_pattern` with that `TimeZone.Name`.
+    :param schedule: schedule dict object, its `TimeZone` is ignored
+    :param timezones: timezone names. e.g. ['Asia/Shanghai', 'America/New_York']
+    :return:
+        A dict of timezone name to the list with all schedule distribution start&end time string.
+    :raise:
+        ValueError
+    """
+    reference = calc_distributions_by_pattern({**schedule, "TimeZone": {"Name": REFERENCE_TIMEZONE}})
+
+    # instance date to (instance index, time key, is cross-day end time), shared by every timezone
+    instance_dates = defaultdict(list)
+    for i, distribution in enumerate(reference):
+        instance_dates[distribution[START_TIME][:10]].append((i, START_TIME, False))
+        if END_TIME in distribution:
+            if distribution[END_TIME][:10] != distribution[START_TIME][:10]:
+                instance_dates[distribution[START_TIME][:10]].append((i, END_TIME, True))
+            instance_dates[distribution[END_TIME][:10]].append((i, END_TIME, False))
+
+    range_start = datetime.date.fromisoformat(schedule["Range"]["StartDateAt"])
+    range_end = datetime.date.fromisoformat(schedule["Range"]["EndDateAt"])
+    scan_since, scan_until = range_start - datetime.timedelta(days=1), range_end + datetime.timedelta(days=3)
+
+    results = {}
+    for timezone_name in timezones:
+        timezone = dateutil_tz.gettz(timezone_name)
+        if timezone is None:
+            raise ValueError(f"Unknown timezone: {timezone_name}")
+        gaps = get_timezone_gaps(timezone, scan_since, scan_until)
+        results[timezone_name] = _localize_distributions(
+            reference, instance_dates, gaps, schedule["Pattern"] in SUB_DAILY_PATTERNS
+        )
+    return results
+
+
+def flatten_timezone_distributions(results: Dict[str, List[dict]]) -> List[dict]:
+    """
+    Flatten the result of `calc_distributions_by_pattern_for_timezones` to one table with a timezone column
+    :param results: timezone name to distributions dict
+    :return: A list with every distribution and its `timezone`
+    """
+    return [
+        {TIMEZONE: timezone_name, **distribution}
+        for timezone_name, distributions in results.items()
+        for distribution in distributions
+    ]
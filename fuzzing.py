@@ -0,0 +1,285 @@
+import datetime
+import random
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+from . import oracle
+from .calculator import WEEK_DAYS_KEYWORDS, WEEKDAYS
+from .exclusions import compile_exclusions
+
+DAILY = "daily"
+WEEKLY = "weekly"
+MONTHLY_BY_DAYS = "monthly_by_days"
+MONTHLY_BY_WEEKS = "monthly_by_weeks"
+
+ORACLES: Dict[str, Callable[..., List[Dict[str, str]]]] = {
+    DAILY: oracle.calc_daily_distributions,
+    WEEKLY: oracle.calc_weekly_distributions,
+    MONTHLY_BY_DAYS: oracle.calc_monthly_distributions_by_days,
+    MONTHLY_BY_WEEKS: oracle.calc_monthly_distributions_by_weeks,
+}
+
+# timezones with DST gaps at midnight, half hour DST, southern hemisphere DST and no DST at all
+FUZZ_TIMEZONES = (
+    "UTC",
+    "Asia/Shanghai",
+    "America/New_York",
+    "Europe/London",
+    "America/Santiago",
+    "America/Havana",
+    "Australia/Lord_Howe",
+    "Asia/Tehran",
+)
+# times around midnight and inside the usual DST gaps
+FUZZ_TIMES = ("12:00 AM", "12:30 AM", "01:59 AM", "02:00 AM", "02:30 AM", "03:00 AM", "11:00 PM", "11:59 PM")
+
+DEFAULT_CASES = 500
+DEFAULT_MAX_RANGE_DAYS = 1200
+
+Outcome = Tuple[Any, ...]
+
+
+class Mismatch(NamedTuple):
+    case: Dict[str, Any]
+    shrunk_case: Dict[str, Any]
+    expected: Outcome
+    actual: Outcome
+
+
+class EngineReport(NamedTuple):
+    engine: str
+    candidate: str
+    cases: int
+    instances: int
+    oracle_seconds: float
+    candidate_seconds: float
+    mismatches: List[Mismatch]
+
+    @property
+    def speedup(self) -> float:
+        return self.oracle_seconds / self.candidate_seconds if self.candidate_seconds else float("inf")
+
+
+def _get_random_time(rng: random.Random) -> str:
+    if rng.random() < 0.5:
+        return rng.choice(FUZZ_TIMES)
+    return f"{rng.randint(1, 12):02d}:{rng.choice((0, 15, 30, 45, rng.randint(0, 59))):02d} {rng.choice(('AM', 'PM'))}"
+
+
+def generate_case(engine: str, rng: random.Random, max_range_days: int = DEFAULT_MAX_RANGE_DAYS) -> Dict[str, Any]:
+    """
+    Generate random keyword arguments of an engine
+    :param engine: the engine kind. e.g. daily
+    :param rng: the random generator
+    :param max_range_days: the max days of the range
+    :return: keyword arguments dict, the exclusions are kept as a date list so the case can be printed and replayed
+    """
+    range_start = datetime.date(1990, 1, 1) + datetime.timedelta(days=rng.randint(0, 365 * 50))
+    range_days = rng.choice((rng.randint(0, 40), rng.randint(0, 400), rng.randint(0, max_range_days)))
+    case: Dict[str, Any] = {
+        "range_start_date": range_start.isoformat(),
+        "range_end_date": (range_start + datetime.timedelta(days=range_days)).isoformat(),
+        "timezone": rng.choice(FUZZ_TIMEZONES),
+        "schedule_start": _get_random_time(rng),
+        "schedule_end": _get_random_time(rng) if rng.random() < 0.7 else None,
+        "exclusions": None,
+    }
+    if rng.random() < 0.2:
+        case["exclusions"] = sorted({
+            (range_start + datetime.timedelta(days=rng.randint(0, range_days + 1))).isoformat()
+            for _ in range(rng.randint(1, 8))
+        })
+
+    if engine == DAILY:
+        case["daily_steps"] = rng.choice((1, 2, 3, 7, rng.randint(1, 60)))
+    elif engine == WEEKLY:
+        case["weekly_steps"] = rng.choice((1, 2, rng.randint(1, 8)))
+        case["weekdays"] = rng.sample(list(WEEKDAYS), rng.randint(1, len(WEEKDAYS)))
+    elif engine == MONTHLY_BY_DAYS:
+        case["day_of_month"] = rng.choice((rng.randint(29, 31), rng.randint(1, 31)))
+        case["monthly_steps"] = rng.choice((1, 2, 3, 12, rng.randint(1, 14)))
+    elif engine == MONTHLY_BY_WEEKS:
+        case["week_ordinal"] = rng.choice(list(WEEK_DAYS_KEYWORDS))
+        case["weekday"] = rng.choice(list(WEEKDAYS))
+        case["monthly_steps"] = rng.choice((1, 2, 3, 12, rng.randint(1, 14)))
+    else:
+        raise ValueError(f"Unknown engine: {engine}")
+    return case
+
+
+def _run(engine: Callable[..., List[Dict[str, str]]], case: Dict[str, Any]) -> Tuple[Outcome, float]:
+    kwargs = dict(case, exclusions=compile_exclusions({"Dates": case["exclusions"]} if case["exclusions"] else None))
+    started_at = time.perf_counter()
+    try:
+        outcome: Outcome = ("ok", engine(**kwargs))
+    except Exception as e:  # the candidate has to fail the same way as the oracle
+        outcome = ("error", type(e).__name__, str(e))
+    return outcome, time.perf_counter() - started_at
+
+
+def _is_mismatch(engine: str, candidate: Callable[..., List[Dict[str, str]]], case: Dict[str, Any]) -> bool:
+    return _run(ORACLES[engine], case)[0] != _run(candidate, case)[0]
+
+
+def _iter_simplifications(case: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    # simpler variants of a case, from the ones removing the most
+    range_start = datetime.date.fromisoformat(case["range_start_date"])
+    range_end = datetime.date.fromisoformat(case["range_end_date"])
+    range_days = (range_end - range_start).days
+    for days in sorted({range_days // 2, range_days - 1}):
+        if 0 <= days < range_days:
+            yield dict(case, range_end_date=(range_start + datetime.timedelta(days=days)).isoformat())
+            yield dict(case, range_start_date=(range_end - datetime.timedelta(days=days)).isoformat())
+
+    if case["exclusions"]:
+        yield dict(case, exclusions=None)
+        for i in range(len(case["exclusions"])):
+            yield dict(case, exclusions=case["exclusions"][:i] + case["exclusions"][i + 1:])
+    if case["schedule_end"] is not None:
+        yield dict(case, schedule_end=None)
+    if case["timezone"] != "UTC":
+        yield dict(case, timezone="UTC")
+    if case["schedule_start"] != "12:00 AM":
+        yield dict(case, schedule_start="12:00 AM")
+
+    for key in ("daily_steps", "weekly_steps", "monthly_steps"):
+        if case.get(key, 1) > 1:
+            yield dict(case, **{key: 1})
+            yield dict(case, **{key: case[key] - 1})
+    if len(case.get("weekdays", ())) > 1:
+        for i in range(len(case["weekdays"])):
+            yield dict(case, weekdays=case["weekdays"][:i] + case["weekdays"][i + 1:])
+    if case.get("week_ordinal", "First") != "First":
+        yield dict(case, week_ordinal="First")
+
+
+def shrink_case(
+        engine: str,
+        candidate: Callable[..., List[Dict[str, str]]],
+        case: Dict[str, Any],
+        max_attempts: int = 2000
+) -> Dict[str, Any]:
+    """
+    Reduce a mismatched case to a simpler one which still mismatches, by shortening the range and dropping
+    or resetting the other arguments until none of the simplifications mismatch
+    :param engine: the engine kind. e.g. daily
+    :param candidate: the engine under test
+    :param case: the mismatched case
+    :param max_attempts: the max count of simplifications to try
+    :return: the shrunk case
+    """
+    attempts = 0
+    shrinking = True
+    while shrinking and attempts < max_attempts:
+        shrinking = False
+        for simplified in _iter_simplifications(case):
+            attempts += 1
+            if _is_mismatch(engine, candidate, simplified):
+                case, shrinking = simplified, True
+                break
+            if attempts >= max_attempts:
+                break
+    return case
+
+
+def check_engine(
+        engine: str,
+        candidate: Callable[..., List[Dict[str, str]]],
+        cases: int = DEFAULT_CASES,
+        seed: int = 0,
+        max_range_days: int = DEFAULT_MAX_RANGE_DAYS,
+        max_mismatches: int = 1
+) -> EngineReport:
+    """
+    Run an engine and its oracle on the same random cases and compare the results, mismatched cases are shrunk
+    :param engine: the engine kind, one of daily/weekly/monthly_by_days/monthly_by_weeks
+    :param candidate: the engine under test, with the same signature as the calculator function of the kind
+    :param cases: the count of random cases
+    :param seed: the random seed, the same seed generates the same cases
+    :param max_range_days: the max days of the range
+    :param max_mismatches: stop after this count of mismatches
+    :return: the report with the mismatches and the time spent by the oracle and the candidate
+    :raise:
+        ValueError
+    """
+    if engine not in ORACLES:
+        raise ValueError(f"Unknown engine: {engine}")
+    rng = random.Random(seed)
+    instances, oracle_seconds, candidate_seconds = 0, 0.0, 0.0
+    mismatches: List[Mismatch] = []
+
+    checked = 0
+    for checked in range(1, cases + 1):
+        case = generate_case(engine, rng, max_range_days)
+        expected, _oracle_seconds = _run(ORACLES[engine], case)
+        actual, _candidate_seconds = _run(candidate, case)
+        oracle_seconds += _oracle_seconds
+        candidate_seconds += _candidate_seconds
+        if expected[0] == "ok":
+            instances += len(expected[1])
+        if expected != actual:
+            shrunk_case = shrink_case(engine, candidate, case)
+            mismatches.append(Mismatch(
+                case=case,
+                shrunk_case=shrunk_case,
+                expected=_run(ORACLES[engine], shrunk_case)[0],
+                actual=_run(candidate, shrunk_case)[0],
+            ))
+            if len(mismatches) >= max_mismatches:
+                break
+
+    return EngineReport(
+        engine=engine,
+        candidate=getattr(candidate, "__qualname__", repr(candidate)),
+        cases=checked,
+        instances=instances,
+        oracle_seconds=oracle_seconds,
+        candidate_seconds=candidate_seconds,
+        mismatches=mismatches,
+    )
+
+
+def check_engines(
+        candidates: Iterable[Tuple[str, Callable[..., List[Dict[str, str]]]]],
+        cases: int = DEFAULT_CASES,
+        seed: int = 0,
+        max_range_days: int = DEFAULT_MAX_RANGE_DAYS
+) -> List[EngineReport]:
+    """
+    Check many engines against their oracles
+    :param candidates: (engine kind, engine under test) pairs. e.g. [('daily', calc_daily)]
+    :param cases: the count of random cases of every engine
+    :param seed: the random seed
+    :param max_range_days: the max days of the range
+    :return: the report of every engine
+    :raise:
+        ValueError
+    """
+    return [check_engine(engine, candidate, cases, seed, max_range_days) for engine, candidate in candidates]
+
+
+def format_reports(reports: List[EngineReport]) -> str:
+    """
+    Format the throughput comparison and the shrunk mismatches of the reports as a text table
+    :param reports: the reports of `check_engine`
+    :return: the text table
+    """
+    width = max([len("candidate")] + [len(report.candidate) for report in reports])
+    lines = [
+        f"{'engine':<16} {'candidate':<{width}} {'cases':>6} {'instances':>10} "
+        f"{'oracle/s':>10} {'candidate/s':>12} {'speedup':>8} {'result':>8}"
+    ]
+    for report in reports:
+        oracle_rate = report.instances / report.oracle_seconds if report.oracle_seconds else 0
+        candidate_rate = report.instances / report.candidate_seconds if report.candidate_seconds else 0
+        lines.append(
+            f"{report.engine:<16} {report.candidate:<{width}} {report.cases:>6} {report.instances:>10} "
+            f"{oracle_rate:>10.0f} {candidate_rate:>12.0f} {report.speedup:>7.2f}x "
+            f"{'FAIL' if report.mismatches else 'OK':>8}"
+        )
+    for report in reports:
+        for mismatch in report.mismatches:
+            lines.append(f"\n{report.engine} mismatch, shrunk case: {mismatch.shrunk_case}")
+            lines.append(f"    expected: {mismatch.expected}")
+            lines.append(f"    actual:   {mismatch.actual}")
+    return "\n".join(lines)
@@ -0,0 +1,185 @@
+import bisect
+import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .calculator import START_TIME, calc_distributions_by_pattern_between, iter_wall_time_epochs
+
+CHECKPOINT_VERSION = 1
+
+# UTC offsets are between -12:00 and +14:00, widened by the largest DST shift
+_MAX_BEHIND_UTC_SECONDS = 14 * 3600
+_MAX_AHEAD_OF_UTC_SECONDS = 16 * 3600
+
+# (start epoch seconds, schedule id, start time string, distribution), the start time string keeps the tuples of
+# one schedule unique, so the distribution dicts are never compared
+IndexEntry = Tuple[int, str, str, dict]
+
+
+def _shift_date(date: str, days: int) -> str:
+    return (datetime.date.fromisoformat(date) + datetime.timedelta(days=days)).isoformat()
+
+
+class HorizonMaterializer:
+    """
+    Keep the schedule distributions of the next `horizon_days` days materialized for many schedules.
+    Each schedule remembers the last date it is materialized until, so advancing the time only calculates
+    the new tail of the horizon. Past instances are evicted, and the rest are kept in one index sorted by the
+    start time, which can be saved by `checkpoint` and loaded by `restore` instead of calculating again.
+    """
+
+    def __init__(self, horizon_days: int = 90):
+        if horizon_days < 0:
+            raise ValueError("Horizon days should not be negative")
+        self.horizon_days = horizon_days
+        self.today: Optional[str] = None
+        self._schedules: Dict[str, dict] = {}
+        self._materialized_until: Dict[str, Optional[str]] = {}
+        self._index: List[IndexEntry] = []
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def add(self, schedule_id: str, schedule: dict) -> None:
+        """
+        Add or replace a schedule. Its instances are materialized right away when the horizon has started,
+        otherwise by the first `advance`
+        :param schedule_id: the schedule id
+        :param schedule: schedule dict object
+        :raise:
+            ValueError
+        """
+        self.remove(schedule_id)
+        self._schedules[schedule_id] = schedule
+        self._materialized_until[schedule_id] = None
+        if self.today is not None:
+            self._insert(self._materialize(schedule_id, self.today, _shift_date(self.today, self.horizon_days)))
+
+    def remove(self, schedule_id: str) -> None:
+        """
+        Remove a schedule and all its materialized instances
+        :param schedule_id: the schedule id
+        """
+        if self._schedules.pop(schedule_id, None) is None:
+            return
+        del self._materialized_until[schedule_id]
+        self._index = [entry for entry in self._index if entry[1] != schedule_id]
+
+    def _insert(self, entries: List[IndexEntry]) -> None:
+        # the sorted new entries are placed by bisecting, and the index is copied between them by slices,
+        # so the old entries are never compared
+        entries.sort()
+        index, position = [], 0
+        for entry in entries:
+            _position = bisect.bisect_left(self._index, entry, position)
+            index += self._index[position:_position]
+            index.append(entry)
+            position = _position
+        index += self._index[position:]
+        self._index = index
+
+    def _evict(self, today: str) -> None:
+        # every schedule keeps its own timezone, so an instance is evicted by its start date string. Instances
+        # starting before today began anywhere on the earth are all evicted, and the ones after today began
+        # everywhere are all kept, only the instances between them are checked one by one
+        midnight = int(datetime.datetime.fromisoformat(today).replace(tzinfo=datetime.timezone.utc).timestamp())
+        low = bisect.bisect_left(self._index, (midnight - _MAX_AHEAD_OF_UTC_SECONDS,))
+        high = bisect.bisect_left(self._index, (midnight + _MAX_BEHIND_UTC_SECONDS,))
+        self._index[low:high] = [entry for entry in self._index[low:high] if entry[2][:10] >= today]
+        del self._index[:low]
+
+    def _materialize(self, schedule_id: str, today: str, until_date: str) -> List[IndexEntry]:
+        schedule = self._schedules[schedule_id]
+        range_end_date = schedule["Range"]["EndDateAt"]
+        materialized_until = self._materialized_until[schedule_id]
+        if materialized_until is not None and materialized_until >= min(until_date, range_end_date):
+            return []
+
+        since_date = today if materialized_until is None else max(_shift_date(materialized_until, 1), today)
+        distributions = calc_distributions_by_pattern_between(schedule, since_date, until_date)
+        self._materialized_until[schedule_id] = until_date
+
+        timezone = schedule["TimeZone"]["Name"]
+        start_times = [distribution[START_TIME] for distribution in distributions]
+        return [
+            (epoch, schedule_id, start_time, distribution)
+            for epoch, start_time, distribution in zip(
+                iter_wall_time_epochs(start_times, timezone), start_times, distributions
+            )
+        ]
+
+    def advance(self, today: str) -> int:
+        """
+        Move the horizon to start at `today`, materialize the new tail and evict the instances start before today
+        :param today: the current date. e.g. 2022-05-18
+        :return: the count of new materialized instances
+        :raise:
+            ValueError
+        """
+        if self.today is not None and today < self.today:
+            raise ValueError("Horizon can not move backwards")
+        self.today = today
+        until_date = _shift_date(today, self.horizon_days)
+
+        new_entries = []
+        for schedule_id in self._schedules:
+            new_entries.extend(self._materialize(schedule_id, today, until_date))
+
+        self._evict(today)
+        self._insert(new_entries)
+        return len(new_entries)
+
+    def query(self, since: int, until: int) -> List[Tuple[str, dict]]:
+        """
+        Get the materialized instances start between two moments
+        :param since: epoch seconds, inclusive
+        :param until: epoch seconds, exclusive
+        :return: A list of (schedule id, distribution) sorted by the start time
+        """
+        low = bisect.bisect_left(self._index, (since,))
+        high = bisect.bisect_left(self._index, (until,))
+        return [(schedule_id, distribution) for _, schedule_id, _, distribution in self._index[low:high]]
+
+    def checkpoint(self) -> dict:
+        """
+        Get the JSON serializable state of the materializer
+        :return: state dict object
+        """
+        instances: Dict[str, List[list]] = {schedule_id: [] for schedule_id in self._schedules}
+        for epoch, schedule_id, _, distribution in self._index:
+            instances[schedule_id].append([epoch, distribution])
+        return {
+            "Version": CHECKPOINT_VERSION,
+            "HorizonDays": self.horizon_days,
+            "Today": self.today,
+            "Schedules": {
+                schedule_id: {
+                    "Schedule": schedule,
+                    "MaterializedUntil": self._materialized_until[schedule_id],
+                    "Instances": instances[schedule_id],
+                }
+                for schedule_id, schedule in self._schedules.items()
+            },
+        }
+
+    @classmethod
+    def restore(cls, state: dict) -> "HorizonMaterializer":
+        """
+        Create a materializer from the state saved by `checkpoint` without calculating the instances again
+        :param state: state dict object
+        :return: the restored materializer
+        :raise:
+            ValueError
+        """
+        if state.get("Version") != CHECKPOINT_VERSION:
+            raise ValueError("Unsupported horizon checkpoint version")
+        materializer = cls(state["HorizonDays"])
+        materializer.today = state["Today"]
+        for schedule_id, schedule_state in state["Schedules"].items():
+            materializer._schedules[schedule_id] = schedule_state["Schedule"]
+            materializer._materialized_until[schedule_id] = schedule_state["MaterializedUntil"]
+            materializer._index.extend(
+                (epoch, schedule_id, distribution[START_TIME], distribution)
+                for epoch, distribution in schedule_state["Instances"]
+            )
+        materializer._index.sort()
+        return materializer
@@ -0,0 +1,111 @@
+import datetime
+from typing import Dict, List
+
+from .calculator import (
+    END_TIME,
+    START_TIME,
+    HOUR,
+    MINUTE,
+    SUB_DAILY_PATTERNS,
+    calc_distributions_by_pattern,
+    calc_distributions_by_pattern_between,
+    format_time_without_second,
+    get_arrow_time_from_string_with_timezone,
+    get_schedule_ranges,
+)
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+
+def _without_end_date(schedule_range: dict) -> dict:
+    return {key: value for key, value in schedule_range.items() if key != "EndDateAt"}
+
+
+def _get_changed_fields(old_schedule: dict, new_schedule: dict) -> set:
+    changed_fields = {key for key in old_schedule.keys() | new_schedule.keys() if
+                      old_schedule.get(key) != new_schedule.get(key)}
+    if "Range" in changed_fields and \
+            _without_end_date(old_schedule["Range"]) == _without_end_date(new_schedule["Range"]):
+        changed_fields.remove("Range")
+        changed_fields.add("Range.EndDateAt")
+    return changed_fields
+
+
+def _diff_distributions(old_distributions: List[dict], new_distributions: List[dict]) -> Dict[str, List[dict]]:
+    old_instances = {distribution[START_TIME]: distribution for distribution in old_distributions}
+    new_instances = {distribution[START_TIME]: distribution for distribution in new_distributions}
+    return {
+        ADDED: [distribution for start, distribution in new_instances.items() if start not in old_instances],
+        REMOVED: [distribution for start, distribution in old_instances.items() if start not in new_instances],
+        CHANGED: [distribution for start, distribution in new_instances.items()
+                  if start in old_instances and old_instances[start] != distribution],
+    }
+
+
+def _calc_range_end_delta(
+        old_schedule: dict,
+        new_schedule: dict,
+        previous: List[dict]
+) -> Dict[str, List[dict]]:
+    # instances starting on or before the earlier range end are the same in both schedules,
+    # only the tail after it needs to be compared
+    split_date = min(old_schedule["Range"]["EndDateAt"], new_schedule["Range"]["EndDateAt"])
+    tail_since = (datetime.date.fromisoformat(split_date) + datetime.timedelta(days=1)).isoformat()
+
+    old_tail = [distribution for distribution in previous if distribution[START_TIME][:10] > split_date]
+    new_tail = calc_distributions_by_pattern_between(new_schedule, tail_since)
+    return _diff_distributions(old_tail, new_tail)
+
+
+def _calc_end_time_delta(new_schedule: dict, previous: List[dict]) -> Dict[str, List[dict]]:
+    # the instance start times are untouched, so only the end time of every instance needs to be rebuilt
+    timezone = new_schedule["TimeZone"]["Name"]
+    _schedule_start, _schedule_end = get_schedule_ranges(new_schedule["StartTime"], new_schedule.get("EndTime"))
+
+    changed = []
+    for distribution in previous:
+        _distribution = {START_TIME: distribution[START_TIME]}
+        if _schedule_end:
+            _day = get_arrow_time_from_string_with_timezone(distribution[START_TIME][:10], timezone)
+            _end = _day.shift(hours=_schedule_end[HOUR], minutes=_schedule_end[MINUTE])
+            if _schedule_end[HOUR] < _schedule_start[HOUR]:  # cross a day, then end time need to shift 1 day
+                _end = _end.shift(days=1)
+            _distribution[END_TIME] = format_time_without_second(_end)
+        if _distribution != distribution:
+            changed.append(_distribution)
+    return {ADDED: [], REMOVED: [], CHANGED: changed}
+
+
+def calc_distributions_delta(
+        old_schedule: dict,
+        new_schedule: dict,
+        previous: List[dict]
+) -> Dict[str, List[dict]]:
+    """
+    Calculate the minimal change between the distributions of an edited schedule and its previous distributions.
+    Only the tail of the range is expanded when just `Range.EndDateAt` changed, and only the end times are rebuilt
+    when just `EndTime` of a daily or longer pattern changed. Any other edit falls back to a full expansion of the
+    new schedule.
+    :param old_schedule:
+        The schedule dict object before the edit
+    :param new_schedule:
+        The schedule dict object after the edit
+    :param previous:
+        The distributions calculated from `old_schedule`
+    :return:
+        A dict with the `added`, `removed` and `changed` distributions, instances are matched by start time.
+        `changed` holds the new version of the instance.
+    :raise:
+        ValueError
+    """
+    changed_fields = _get_changed_fields(old_schedule, new_schedule)
+    if not changed_fields:
+        return {ADDED: [], REMOVED: [], CHANGED: []}
+    if changed_fields == {"Range.EndDateAt"}:
+        return _calc_range_end_delta(old_schedule, new_schedule, previous)
+    if changed_fields == {"EndTime"} and new_schedule["Pattern"] not in SUB_DAILY_PATTERNS:
+        # the sub-daily end time bounds the window of start times, which is not just a change of the end times
+        return _calc_end_time_delta(new_schedule, previous)
+    return _diff_distributions(previous, calc_distributions_by_pattern(new_schedule))
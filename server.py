@@ -0,0 +1,206 @@
+import asyncio
+import itertools
+import json
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .calculator import SUB_DAILY_PATTERNS, calc_distributions_by_pattern, iter_distributions_by_pattern
+from .sharding import estimate_schedule_cost
+from .store import get_schedule_fingerprint
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_INSTANCES = 1000000
+DEFAULT_MAX_PIPELINED = 16
+# schedules estimated to cost more than this, about 20ms, are expanded in the worker pool instead of the event loop
+DEFAULT_INLINE_COST_LIMIT = 400
+
+_STREAM_LIMIT = 1 << 20  # max bytes of one request line
+
+
+class ScheduleServer:
+    """
+    Asyncio server streaming schedule distributions over a local TCP connection. Every request and response is
+    one line of JSON. A request is `{"id": ..., "schedule": {...}}`, the response is a series of
+    `{"id": ..., "chunk": [...]}` lines followed by `{"id": ..., "done": true, "count": n}`, or
+    `{"id": ..., "error": "..."}`. Requests can be pipelined on one connection, their chunks are interleaved and
+    told apart by the id. Expanded schedules are kept in an LRU keyed by the schedule fingerprint and bounded by
+    the count of schedules and of their instances, and heavy expansions run in a worker process pool. Sub-daily
+    schedules are generated lazily a chunk at a time as the client reads them, and are not cached.
+    """
+
+    def __init__(
+            self,
+            host: str = DEFAULT_HOST,
+            port: int = DEFAULT_PORT,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            cache_size: int = DEFAULT_CACHE_SIZE,
+            cache_instances: int = DEFAULT_CACHE_INSTANCES,
+            max_pipelined: int = DEFAULT_MAX_PIPELINED,
+            inline_cost_limit: float = DEFAULT_INLINE_COST_LIMIT,
+            executor: Optional[Executor] = None
+    ):
+        self.host = host
+        self.port = port
+        self.chunk_size = chunk_size
+        self.cache_size = cache_size
+        self.cache_instances = cache_instances
+        self.max_pipelined = max_pipelined
+        self.inline_cost_limit = inline_cost_limit
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._cache: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._cached_instances = 0
+        self._expanding: Dict[str, "asyncio.Future[List[dict]]"] = {}  # the same schedule is expanded only once
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """
+        Start listening, the port is updated to the bound one when it is 0
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port, limit=_STREAM_LIMIT)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        server = self._server
+        assert server is not None
+        async with server:
+            await server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def __aenter__(self) -> "ScheduleServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def _expand(self, schedule: dict) -> List[dict]:
+        fingerprint = get_schedule_fingerprint(schedule)
+        if fingerprint in self._cache:
+            self._cache.move_to_end(fingerprint)
+            return self._cache[fingerprint]
+        expanding = self._expanding.get(fingerprint)
+        if expanding is not None:
+            try:
+                return await asyncio.shield(expanding)
+            except asyncio.CancelledError:
+                if not expanding.cancelled():
+                    raise
+                return await self._expand(schedule)  # the request expanding it went away, expand it again
+
+        future = asyncio.get_running_loop().create_future()
+        self._expanding[fingerprint] = future
+        try:
+            if estimate_schedule_cost(schedule) <= self.inline_cost_limit:
+                distributions = calc_distributions_by_pattern(schedule)
+            else:
+                distributions = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, calc_distributions_by_pattern, schedule
+                )
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # the waiting requests get the error, don't log it as never retrieved
+            raise
+        finally:
+            del self._expanding[fingerprint]
+
+        future.set_result(distributions)
+        self._add_to_cache(fingerprint, distributions)
+        return distributions
+
+    def _add_to_cache(self, fingerprint: str, distributions: List[dict]) -> None:
+        if len(distributions) > self.cache_instances:
+            return
+        self._cache[fingerprint] = distributions
+        self._cached_instances += len(distributions)
+        while len(self._cache) > self.cache_size or self._cached_instances > self.cache_instances:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_instances -= len(evicted)
+
+    async def _iter_chunks(self, schedule: dict) -> AsyncIterator[List[dict]]:
+        if schedule["Pattern"] in SUB_DAILY_PATTERNS:
+            # the next chunk is generated only after the previous one is written, so a slow client pauses the
+            # generation instead of the whole result piling up in memory
+            lazy_distributions = iter_distributions_by_pattern(schedule)
+            while True:
+                chunk = list(itertools.islice(lazy_distributions, self.chunk_size))
+                if not chunk:
+                    return
+                yield chunk
+                await asyncio.sleep(0)  # let the other requests run between the chunks
+        else:
+            distributions = await self._expand(schedule)
+            for i in range(0, len(distributions), self.chunk_size):
+                yield distributions[i:i + self.chunk_size]
+
+    async def _write(self, writer: asyncio.StreamWriter, lock: asyncio.Lock, message: Dict[str, Any]) -> None:
+        async with lock:
+            writer.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()  # wait while the client doesn't read, instead of buffering the whole result
+
+    async def _handle_request(
+            self,
+            line: bytes,
+            writer: asyncio.StreamWriter,
+            lock: asyncio.Lock,
+            pipelined: asyncio.Semaphore
+    ) -> None:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            count = 0
+            async for chunk in self._iter_chunks(request["schedule"]):
+                await self._write(writer, lock, {"id": request_id, "chunk": chunk})
+                count += len(chunk)
+            await self._write(writer, lock, {"id": request_id, "done": True, "count": count})
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            await self._write(writer, lock, {"id": request_id, "error": f"{type(e).__name__}: {e}"})
+        finally:
+            pipelined.release()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        pipelined = asyncio.Semaphore(self.max_pipelined)
+        tasks = set()
+        try:
+            while True:
+                await pipelined.acquire()  # stop reading requests while too many of them are in progress
+                line = await reader.readline()
+                if not line:
+                    pipelined.release()
+                    break
+                if not line.strip():
+                    pipelined.release()
+                    continue
+                task = asyncio.ensure_future(self._handle_request(line, writer, lock, pipelined))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # the client went away or sent a line over the limit
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
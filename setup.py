@@ -43,6 +43,14 @@ setup(
     python_requires=">=3.7",
     install_requires=read_requirements(),
     extras_require={
+        "pandas": [
+            "numpy>=1.20.0",
+            "pandas>=1.3.0",
+        ],
+        "pyarrow": [
+            "numpy>=1.20.0",
+            "pyarrow>=8.0.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
@@ -0,0 +1,189 @@
+import bisect
+import datetime
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .calculator import (
+    SUB_DAILY_PATTERNS,
+    calc_distributions_by_pattern,
+    get_sub_daily_period_days,
+    get_sub_daily_slots,
+)
+
+DEFAULT_VIRTUAL_NODES = 128
+DEFAULT_LOAD_FACTOR = 1.25
+
+# costs relative to walking one day of a monthly schedule repeating every month, measured on the engines.
+# The sub-daily and daily engines only format strings with the cached UTC offsets of every day, and the weekly
+# engine shifts by Arrow per week and per instance
+_SUB_DAILY_DAY_COST = 0.075
+_SUB_DAILY_INSTANCE_COST = 0.013
+_DAILY_DAY_COST = 0.02
+_DAILY_INSTANCE_COST = 0.03
+_WEEKLY_STEP_COST = 1.4
+
+
+def _get_hash(key: str) -> int:
+    # the builtin hash of str is salted per process, so the ring would differ between nodes
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+def _get_range_days(schedule: dict) -> int:
+    range_start = datetime.date.fromisoformat(schedule["Range"]["StartDateAt"])
+    range_end = datetime.date.fromisoformat(schedule["Range"]["EndDateAt"])
+    return max((range_end - range_start).days + 1, 1)
+
+
+def estimate_schedule_cost(schedule: dict) -> float:
+    """
+    Estimate the relative cost of expanding a schedule, which is about the count of Arrow operations its
+    engine runs. The sub-daily and daily engines step by day and instance without Arrow, the weekly engine by
+    week and instance, and the monthly engines walk every day of the range and shift by Arrow once more for
+    every month of `EveryMonths`.
+    :param schedule: schedule dict object
+    :return: the estimated cost, at least 1
+    """
+    days = _get_range_days(schedule)
+    pattern = schedule["Pattern"]
+    if pattern in SUB_DAILY_PATTERNS:
+        steps = schedule["HourlyOptions"]["EveryHours"] * 60 if pattern == "Hourly" \
+            else schedule["MinutelyOptions"]["EveryMinutes"]
+        slots = len(get_sub_daily_slots(steps, schedule["StartTime"], schedule.get("EndTime"))) / \
+            get_sub_daily_period_days(steps, schedule.get("EndTime"))
+        return max(days * (_SUB_DAILY_DAY_COST + slots * _SUB_DAILY_INSTANCE_COST), 1)
+    if pattern == "Daily":
+        instances: float = days / schedule["DailyOptions"]["EveryDays"]
+        return max(days * _DAILY_DAY_COST + instances * _DAILY_INSTANCE_COST, 1)
+    if pattern == "Weekly":
+        weekly_options = schedule["WeeklyOptions"]
+        weeks: float = days / 7 / weekly_options["RecursiveEveryWeeks"]
+        return max(weeks * (1 + len(weekly_options["WeekDays"])) * _WEEKLY_STEP_COST, 1)
+    monthly_options = schedule["MonthlyOptions"]
+    every_months: int = monthly_options[monthly_options["Type"]]["EveryMonths"]
+    return days * (1 + every_months) / 2
+
+
+class ConsistentHashRing:
+    """
+    Hash ring of `shard_count` shards, every shard is placed at `virtual_nodes` points so the keys spread evenly.
+    Adding a shard only takes keys from its new points, the rest of the keys keep their shard.
+    """
+
+    def __init__(self, shard_count: int, virtual_nodes: int = DEFAULT_VIRTUAL_NODES):
+        if shard_count <= 0:
+            raise ValueError("Shard count should be positive")
+        self.shard_count = shard_count
+        points = sorted(
+            (_get_hash(f"shard-{shard}#{node}"), shard)
+            for shard in range(shard_count)
+            for node in range(virtual_nodes)
+        )
+        self._hashes = [point_hash for point_hash, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def iter_shards(self, key: str) -> Iterator[int]:
+        """
+        Walk the ring clockwise from the key
+        :param key: the key. e.g. schedule id
+        :return: an iterator of every shard once, in the order the ring prefers them for the key
+        """
+        start = bisect.bisect(self._hashes, _get_hash(key))
+        seen = set()
+        for i in range(len(self._shards)):
+            shard = self._shards[(start + i) % len(self._shards)]
+            if shard not in seen:
+                seen.add(shard)
+                yield shard
+                if len(seen) == self.shard_count:
+                    return
+
+    def get_shard(self, key: str) -> int:
+        return next(self.iter_shards(key))
+
+
+def assign_schedules_to_shards(
+        schedules: Dict[str, dict],
+        shard_count: int,
+        load_factor: float = DEFAULT_LOAD_FACTOR,
+        virtual_nodes: int = DEFAULT_VIRTUAL_NODES
+) -> List[List[str]]:
+    """
+    Assign schedules to shards by consistent hashing with bounded loads. Every shard takes up to `load_factor`
+    times the average estimated cost, a schedule going to a full shard moves on to the next shard of the ring.
+    The schedules are placed from the most expensive one, so the result is the same on every node, and only a
+    few schedules change their shard when `shard_count` changes.
+    :param schedules: schedule id to schedule dict object
+    :param shard_count: the count of shards. e.g. the count of worker nodes
+    :param load_factor: the max shard cost to the average shard cost, should not be less than 1
+    :param virtual_nodes: the count of ring points of every shard
+    :return: the schedule ids of every shard, sorted by the estimated cost from high to low
+    :raise:
+        ValueError
+    """
+    if load_factor < 1:
+        raise ValueError("Load factor should not be less than 1")
+    ring = ConsistentHashRing(shard_count, virtual_nodes)
+    costs = {schedule_id: estimate_schedule_cost(schedule) for schedule_id, schedule in schedules.items()}
+    capacity = sum(costs.values()) / shard_count * load_factor
+
+    shards: List[List[str]] = [[] for _ in range(shard_count)]
+    loads = [0.0] * shard_count
+    for schedule_id in sorted(costs, key=lambda _id: (-costs[_id], _id)):
+        # a schedule costing more than the capacity still goes to the first shard which isn't full
+        shard = next(
+            (_shard for _shard in ring.iter_shards(schedule_id) if loads[_shard] + costs[schedule_id] <= capacity),
+            None
+        )
+        if shard is None:
+            shard = min(range(shard_count), key=lambda _shard: (loads[_shard], _shard))
+        shards[shard].append(schedule_id)
+        loads[shard] += costs[schedule_id]
+    return shards
+
+
+class ShardResult(NamedTuple):
+    shard: int
+    distributions: Dict[str, List[dict]]
+    estimated_cost: float
+    elapsed: float
+    pid: int
+
+
+def _expand_shard(shard: int, schedules: List[Tuple[str, dict]]) -> ShardResult:
+    started_at = time.perf_counter()
+    distributions = {schedule_id: calc_distributions_by_pattern(schedule) for schedule_id, schedule in schedules}
+    return ShardResult(
+        shard=shard,
+        distributions=distributions,
+        estimated_cost=sum(estimate_schedule_cost(schedule) for _, schedule in schedules),
+        elapsed=time.perf_counter() - started_at,
+        pid=os.getpid(),
+    )
+
+
+def run_shards_locally(
+        schedules: Dict[str, dict],
+        shard_count: int,
+        processes: Optional[int] = None,
+        load_factor: float = DEFAULT_LOAD_FACTOR
+) -> List[ShardResult]:
+    """
+    Simulate `shard_count` worker nodes with local processes, every process expands the schedules of one shard
+    :param schedules: schedule id to schedule dict object
+    :param shard_count: the count of simulated nodes
+    :param processes: the count of worker processes, which is optional. Defaults to `shard_count`
+    :param load_factor: the max shard cost to the average shard cost
+    :return: the result of every shard, in shard order
+    :raise:
+        ValueError
+    """
+    shards = assign_schedules_to_shards(schedules, shard_count, load_factor)
+    with ProcessPoolExecutor(max_workers=processes or shard_count) as executor:
+        futures = [
+            executor.submit(_expand_shard, shard, [(schedule_id, schedules[schedule_id]) for schedule_id in ids])
+            for shard, ids in enumerate(shards)
+        ]
+        return [future.result() for future in futures]
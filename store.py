@@ -0,0 +1,326 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]  # not available on Windows, the index is still merged but without the lock
+
+import arrow
+
+from .calculator import (
+    END_TIME,
+    START_TIME,
+    calc_distributions_by_pattern,
+    format_time_without_second,
+    iter_wall_time_epochs,
+)
+from .exclusions import EXCLUSION_CALENDARS
+
+STORE_MAGIC = b"SGEX"
+STORE_VERSION = 1
+INDEX_FILE_NAME = "index.json"
+INDEX_LOCK_FILE_NAME = "index.lock"
+DATA_FILE_SUFFIX = ".bin"
+
+HAS_END_TIME = 1
+
+# magic, version, flags, instance count. 16 bytes, so the int64 columns after it stay aligned
+_HEADER = struct.Struct("=4sHHq")
+_EPOCH_TYPECODE = "q"
+_EPOCH_SIZE = 8
+
+
+def _cast_epochs(view: memoryview) -> memoryview:
+    return view.cast("q")  # the same as _EPOCH_TYPECODE, memoryview only takes a literal format
+
+
+def get_schedule_fingerprint(schedule: dict) -> str:
+    """
+    Get the hash of a schedule definition, any change of the definition changes the hash
+    :param schedule: schedule dict object
+    :return: hex digest string
+    """
+    # named exclusion calendars are resolved, so re-registering a calendar also changes the hash
+    calendars = {
+        name: sorted(EXCLUSION_CALENDARS.get(name, ()))
+        for name in (schedule.get("Exclusions") or {}).get("Calendars", [])
+    }
+    definition = json.dumps([schedule, calendars], sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(definition.encode("utf-8")).hexdigest()
+
+
+def _get_time_string(epoch: int, timezone: str) -> str:
+    return format_time_without_second(arrow.Arrow.fromtimestamp(epoch, tzinfo=timezone))
+
+
+def get_distributions_epochs(distributions: List[dict], timezone: str) -> Tuple[array, Optional[array]]:
+    """
+    Convert distributions to int64 epoch seconds columns, the times are added to the cached epoch of their day
+    start instead of being parsed one by one
+    :param distributions: the distributions calculated in `timezone`
+    :param timezone: timezone of the distributions. e.g. Asia/Shanghai
+    :return: the start times column, and the end times column or None when the instances have no end time
+    """
+    start_times = array(_EPOCH_TYPECODE, iter_wall_time_epochs([d[START_TIME] for d in distributions], timezone))
+    if not distributions or END_TIME not in distributions[0]:
+        return start_times, None
+    return start_times, array(_EPOCH_TYPECODE, iter_wall_time_epochs([d[END_TIME] for d in distributions], timezone))
+
+
+class StoredDistributions:
+    """
+    Read-only view of the stored distributions of one schedule. `start_times` and `end_times` are int64 epoch
+    seconds columns sliced straight out of the memory-mapped file, slicing them does not copy.
+    """
+
+    def __init__(self, path: str, timezone: str):
+        self.path = path
+        self.timezone = timezone
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, flags, count = _HEADER.unpack_from(self._mmap)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            self._mmap.close()
+            raise ValueError(f"Unsupported distribution store file: {path}")
+
+        self._view = memoryview(self._mmap)
+        column_size = count * _EPOCH_SIZE
+        self.start_times = _cast_epochs(self._view[_HEADER.size:_HEADER.size + column_size])
+        self.end_times: Optional[memoryview] = None
+        if flags & HAS_END_TIME:
+            self.end_times = _cast_epochs(self._view[_HEADER.size + column_size:_HEADER.size + column_size * 2])
+
+    def __len__(self) -> int:
+        return len(self.start_times)
+
+    def __enter__(self) -> "StoredDistributions":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def to_distributions(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Format the stored instances between `start` and `stop` back to distribution dicts
+        :param start: first instance index
+        :param stop: instance index to stop before, which is optional
+        :return: A list with schedule distribution start&end time string.
+        """
+        start_times = self.start_times[start:stop]
+        end_times = self.end_times[start:stop] if self.end_times is not None else None
+
+        instances = []
+        for i, start_time in enumerate(start_times):
+            _distribution = {START_TIME: _get_time_string(start_time, self.timezone)}
+            if end_times is not None:
+                _distribution[END_TIME] = _get_time_string(end_times[i], self.timezone)
+            instances.append(_distribution)
+        return instances
+
+    def close(self) -> None:
+        # exported views have to be released before the map can be closed
+        self.start_times.release()
+        if self.end_times is not None:
+            self.end_times.release()
+        self._view.release()
+        self._mmap.close()
+
+
+class DistributionStore:
+    """
+    On-disk store of calculated schedule distributions. Every schedule is written as a fixed-width binary file
+    of int64 start/end epoch columns, named by the hash of its definition. The index file maps the schedule id
+    to that hash, so a changed definition invalidates the stored distributions. Stores of many processes can
+    share one directory, the data files and the index are written under a file lock, and the index is merged
+    with the one on disk before it is written.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, INDEX_FILE_NAME)
+        self._index: Dict[str, Dict[str, str]] = {}
+        self._index_stat: Optional[Tuple[int, int, int]] = None  # the index file this store read or wrote last
+        self._refcounts: Counter = Counter()  # fingerprint to the count of schedule ids stored with it
+        self._read_index()
+        self._pending: Dict[str, Optional[Dict[str, str]]] = {}  # unwritten index entries, None when removed
+        self._pending_data: Dict[str, bytes] = {}  # fingerprint to the content of its unwritten data file
+        self._released: set = set()  # fingerprints which lost a reference since the index was written
+        self._batch_depth = 0
+
+    def _get_data_path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, fingerprint + DATA_FILE_SUFFIX)
+
+    def _get_index_stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self._index_path)
+        except FileNotFoundError:
+            return None
+        # the index is always replaced by a new file, so the inode tells apart writes of other processes
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _read_index(self) -> None:
+        self._index_stat = self._get_index_stat()
+        self._index = {}
+        if self._index_stat is not None:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+        self._refcounts = Counter(entry["fingerprint"] for entry in self._index.values())
+
+    def _write_atomically(self, path: str, content: bytes) -> None:
+        # a unique temp file, so processes writing the same path don't write into the temp file of each other
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @contextmanager
+    def _lock_index(self) -> Iterator[None]:
+        with open(os.path.join(self.directory, INDEX_LOCK_FILE_NAME), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)  # released when the file is closed
+            yield
+
+    def _set_entry(self, schedule_id: str, entry: Optional[Dict[str, str]]) -> None:
+        previous = self._index.pop(schedule_id, None)
+        if previous:
+            self._refcounts[previous["fingerprint"]] -= 1
+            self._released.add(previous["fingerprint"])
+        if entry:
+            self._index[schedule_id] = entry
+            self._refcounts[entry["fingerprint"]] += 1
+        self._pending[schedule_id] = entry
+        if not self._batch_depth:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the pending data files and index changes, and remove the data files no schedule refers to any more.
+        When another process changed the index since this store read it, its entries are merged before writing.
+        """
+        if not self._pending:
+            return
+        with self._lock_index():
+            if self._get_index_stat() != self._index_stat:
+                pending = self._pending
+                self._read_index()
+                for schedule_id, entry in pending.items():
+                    previous = self._index.pop(schedule_id, None)
+                    if previous:
+                        self._refcounts[previous["fingerprint"]] -= 1
+                        self._released.add(previous["fingerprint"])
+                    if entry:
+                        self._index[schedule_id] = entry
+                        self._refcounts[entry["fingerprint"]] += 1
+
+            # the data files are written under the lock together with their index entries, so another store
+            # never sees a data file without a reference and removes it
+            for fingerprint, data in self._pending_data.items():
+                if self._refcounts[fingerprint] > 0:
+                    self._write_atomically(self._get_data_path(fingerprint), data)
+
+            content = json.dumps(self._index, sort_keys=True, ensure_ascii=False).encode("utf-8")
+            self._write_atomically(self._index_path, content)
+            self._index_stat = self._get_index_stat()
+            for fingerprint in self._released:
+                if self._refcounts[fingerprint] <= 0:
+                    del self._refcounts[fingerprint]
+                    data_path = self._get_data_path(fingerprint)
+                    if os.path.exists(data_path):
+                        os.remove(data_path)
+        self._pending = {}
+        self._pending_data = {}
+        self._released = set()
+
+    @contextmanager
+    def batch(self) -> Iterator["DistributionStore"]:
+        """
+        Defer the data file and index writes of `save` and `remove` to the end of the block, so storing many
+        schedules writes the index once
+        :return: this store
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+
+    def save(self, schedule_id: str, schedule: dict, distributions: List[dict]) -> str:
+        """
+        Store the distributions calculated from a schedule
+        :param schedule_id: the id the schedule is stored under
+        :param schedule: schedule dict object
+        :param distributions: the distributions calculated from `schedule`
+        :return: the schedule fingerprint
+        """
+        timezone = schedule["TimeZone"]["Name"]
+        fingerprint = get_schedule_fingerprint(schedule)
+        start_times, end_times = get_distributions_epochs(distributions, timezone)
+
+        flags = HAS_END_TIME if end_times is not None else 0
+        content = _HEADER.pack(STORE_MAGIC, STORE_VERSION, flags, len(start_times)) + start_times.tobytes()
+        if end_times is not None:
+            content += end_times.tobytes()
+        self._pending_data[fingerprint] = content
+
+        self._set_entry(schedule_id, {"fingerprint": fingerprint, "timezone": timezone})
+        return fingerprint
+
+    def load(self, schedule_id: str, schedule: dict) -> Optional[StoredDistributions]:
+        """
+        Load the stored distributions of a schedule
+        :param schedule_id: the id the schedule is stored under
+        :param schedule: the current schedule dict object
+        :return: the stored distributions, or None when nothing is stored or the schedule definition changed
+        """
+        entry = self._index.get(schedule_id)
+        if not entry or entry["fingerprint"] != get_schedule_fingerprint(schedule):
+            return None
+        if entry["fingerprint"] in self._pending_data:
+            self.flush()  # saved in a batch, which is not written yet
+        data_path = self._get_data_path(entry["fingerprint"])
+        if not os.path.exists(data_path):
+            return None
+        return StoredDistributions(data_path, entry["timezone"])
+
+    def load_or_calc(self, schedule_id: str, schedule: dict) -> StoredDistributions:
+        """
+        Load the stored distributions of a schedule, calculate and store them first if they are missing or stale
+        :param schedule_id: the id the schedule is stored under
+        :param schedule: schedule dict object
+        :return: the stored distributions
+        :raise:
+            ValueError
+        """
+        stored = self.load(schedule_id, schedule)
+        if stored is None:
+            self.save(schedule_id, schedule, calc_distributions_by_pattern(schedule))
+            stored = self.load(schedule_id, schedule)
+        if stored is None:
+            # only when another process sharing the directory removed it right after it was saved
+            raise ValueError(f"Stored distributions of {schedule_id} were removed by another process")
+        return stored
+
+    def remove(self, schedule_id: str) -> None:
+        """
+        Remove the stored distributions of a schedule
+        :param schedule_id: the id the schedule is stored under
+        """
+        self._set_entry(schedule_id, None)  # the id may be stored by another process sharing the directory
@@ -2,14 +2,22 @@
 Tests for the calculator module
 """
 
+import arrow
 import pytest
+from schedule_generator import oracle
 from schedule_generator.calculator import (
     calc_daily_distributions,
     calc_weekly_distributions,
     calc_monthly_distributions_by_days,
     calc_monthly_distributions_by_weeks,
+    calc_hourly_distributions,
+    calc_minutely_distributions,
     calc_distributions_by_pattern,
+    iter_distributions_by_pattern,
+    format_time_without_second,
+    TIME_FORMAT_WITHOUT_SECOND,
 )
+from schedule_generator.exclusions import compile_exclusions
 
 
 class TestDailyDistributions:
@@ -138,6 +146,196 @@ class TestPatternDistributions:
         assert len(result) == 5  # 每2天一次，从5月1日到5月10日
 
 
+class TestSubDailyDistributions:
+    def test_hourly_distributions_basic(self):
+        """测试每天时间窗口内的每小时重复"""
+        result = calc_hourly_distributions(
+            range_start_date="2022-05-01",
+            range_end_date="2022-05-02",
+            hourly_steps=3,
+            timezone="Asia/Shanghai",
+            schedule_start="09:00 AM",
+            schedule_end="06:00 PM"
+        )
+
+        assert [d["start_time"] for d in result] == [
+            "2022-05-01 09:00", "2022-05-01 12:00", "2022-05-01 15:00", "2022-05-01 18:00",
+            "2022-05-02 09:00", "2022-05-02 12:00", "2022-05-02 15:00", "2022-05-02 18:00",
+        ]
+        assert "end_time" not in result[0]
+
+    def test_minutely_distributions_cross_day(self):
+        """测试跨天的时间窗口"""
+        result = calc_minutely_distributions(
+            range_start_date="2022-05-01",
+            range_end_date="2022-05-01",
+            minutely_steps=30,
+            timezone="Asia/Shanghai",
+            schedule_start="11:00 PM",
+            schedule_end="12:30 AM"
+        )
+
+        assert [d["start_time"] for d in result] == [
+            "2022-05-01 23:00", "2022-05-01 23:30", "2022-05-02 00:00", "2022-05-02 00:30",
+        ]
+
+    def test_minutely_distributions_without_end_time(self):
+        """测试没有结束时间时持续整天"""
+        result = calc_minutely_distributions(
+            range_start_date="2022-05-01",
+            range_end_date="2022-05-02",
+            minutely_steps=15,
+            timezone="Asia/Shanghai",
+            schedule_start="12:00 AM"
+        )
+
+        assert len(result) == 2 * 24 * 4
+        assert result[-1]["start_time"] == "2022-05-02 23:45"
+
+    def test_hourly_distributions_window_past_range_end(self):
+        """测试最后一天的时间窗口跨零点时会超出区间结束日期"""
+        result = calc_hourly_distributions(
+            range_start_date="2022-05-01",
+            range_end_date="2022-05-01",
+            hourly_steps=1,
+            timezone="Asia/Shanghai",
+            schedule_start="10:00 PM"
+        )
+
+        assert len(result) == 24
+        assert result[1]["start_time"] == "2022-05-01 23:00"
+        assert result[2]["start_time"] == "2022-05-02 00:00"
+        assert result[-1]["start_time"] == "2022-05-02 21:00"
+
+    def test_steps_not_dividing_a_day(self):
+        """测试没有结束时间且间隔不能整除一天时连续重复"""
+        result = calc_hourly_distributions(
+            range_start_date="2022-05-01",
+            range_end_date="2022-05-03",
+            hourly_steps=5,
+            timezone="UTC",
+            schedule_start="12:00 AM"
+        )
+
+        assert [d["start_time"] for d in result] == [
+            "2022-05-01 00:00", "2022-05-01 05:00", "2022-05-01 10:00", "2022-05-01 15:00", "2022-05-01 20:00",
+            "2022-05-02 01:00", "2022-05-02 06:00", "2022-05-02 11:00", "2022-05-02 16:00", "2022-05-02 21:00",
+            "2022-05-03 02:00", "2022-05-03 07:00", "2022-05-03 12:00", "2022-05-03 17:00", "2022-05-03 22:00",
+        ]
+
+    def test_steps_longer_than_a_day(self):
+        """测试没有结束时间且间隔超过一天时连续重复"""
+        result = calc_hourly_distributions(
+            range_start_date="2022-05-01",
+            range_end_date="2022-05-08",
+            hourly_steps=30,
+            timezone="UTC",
+            schedule_start="12:00 AM",
+            exclusions=compile_exclusions({"Dates": ["2022-05-03"]})
+        )
+
+        assert [d["start_time"] for d in result] == [
+            "2022-05-01 00:00", "2022-05-02 06:00", "2022-05-04 18:00",
+            "2022-05-06 00:00", "2022-05-07 06:00", "2022-05-08 12:00",
+        ]
+
+    def test_invalid_sub_daily_window(self):
+        """测试时间窗口内的间隔超过一天或不能整除时间窗口"""
+        with pytest.raises(ValueError, match="Sub-daily steps should not be longer than a day"):
+            calc_hourly_distributions("2022-05-01", "2022-05-01", 25, "UTC", "09:00 AM", "05:00 PM")
+        with pytest.raises(ValueError, match="Sub-daily steps should divide the active window"):
+            calc_hourly_distributions("2022-05-01", "2022-05-01", 3, "UTC", "09:00 AM", "05:00 PM")
+
+    def test_sub_daily_distributions_skip_dst_gap(self):
+        """测试夏令时跳过的时间被略过"""
+        result = calc_minutely_distributions(
+            range_start_date="2022-03-13",
+            range_end_date="2022-03-13",
+            minutely_steps=30,
+            timezone="America/New_York",
+            schedule_start="01:00 AM",
+            schedule_end="03:30 AM"
+        )
+
+        assert [d["start_time"] for d in result] == [
+            "2022-03-13 01:00", "2022-03-13 01:30", "2022-03-13 03:00", "2022-03-13 03:30",
+        ]
+
+    def test_sub_daily_pattern(self):
+        """测试使用统一接口按需生成"""
+        schedule_config = {
+            "Pattern": "Hourly",
+            "HourlyOptions": {"EveryHours": 6},
+            "StartTime": "12:00 AM",
+            "TimeZone": {"Name": "Asia/Shanghai"},
+            "Range": {"StartDateAt": "2022-05-01", "EndDateAt": "2022-05-10"},
+            "Exclusions": {"Dates": ["2022-05-04"]}
+        }
+
+        result = calc_distributions_by_pattern(schedule_config)
+        assert len(result) == 9 * 4
+        assert all(not d["start_time"].startswith("2022-05-04") for d in result)
+        assert list(iter_distributions_by_pattern(schedule_config)) == result
+
+    def test_invalid_sub_daily_steps(self):
+        """测试无效的间隔"""
+        with pytest.raises(ValueError, match="Sub-daily steps should be positive"):
+            calc_minutely_distributions(
+                range_start_date="2022-05-01",
+                range_end_date="2022-05-01",
+                minutely_steps=0,
+                timezone="Asia/Shanghai",
+                schedule_start="08:00 AM"
+            )
+
+
+class TestDailyFastPath:
+    def test_same_as_oracle_across_dst(self):
+        """测试每日模式在夏令时前后与基准实现一致"""
+        for timezone in ("America/New_York", "America/Santiago", "Australia/Lord_Howe", "Asia/Shanghai"):
+            windows = (("02:30 AM", None), ("11:00 PM", "02:30 AM"), ("12:00 AM", "12:30 AM"))
+            for schedule_start, schedule_end in windows:
+                kwargs = dict(
+                    range_start_date="2021-01-01",
+                    range_end_date="2023-12-31",
+                    daily_steps=1,
+                    timezone=timezone,
+                    schedule_start=schedule_start,
+                    schedule_end=schedule_end
+                )
+                assert calc_daily_distributions(**kwargs) == oracle.calc_daily_distributions(**kwargs)
+
+    def test_cross_day_end_in_dst_gap(self):
+        """测试跨天的结束时间落在夏令时跳过的时间内"""
+        result = calc_daily_distributions(
+            range_start_date="2022-03-12",
+            range_end_date="2022-03-13",
+            daily_steps=1,
+            timezone="America/New_York",
+            schedule_start="11:00 PM",
+            schedule_end="02:30 AM"
+        )
+
+        assert result == [
+            {"start_time": "2022-03-12 23:00", "end_time": "2022-03-13 03:30"},
+            # the end time is built on the start day first, where 02:30 doesn't exist, then moved 1 day later
+            {"start_time": "2022-03-13 23:00", "end_time": "2022-03-14 03:30"},
+        ]
+
+
+class TestFormatTimeWithoutSecond:
+    def test_same_as_arrow_format(self):
+        """测试缓存的格式化结果与 Arrow 格式化一致"""
+        times = [
+            arrow.get("0001-01-01 00:00", "YYYY-MM-DD HH:mm", tzinfo="UTC"),
+            arrow.get("2022-03-13 01:59", "YYYY-MM-DD HH:mm", tzinfo="America/New_York").shift(minutes=1),
+            arrow.get("2022-11-06 01:30", "YYYY-MM-DD HH:mm", tzinfo="America/New_York"),
+            arrow.get("2024-02-29 23:45", "YYYY-MM-DD HH:mm", tzinfo="Asia/Shanghai"),
+        ]
+        for time in times:
+            assert format_time_without_second(time) == time.format(TIME_FORMAT_WITHOUT_SECOND)
+
+
 class TestErrorCases:
     def test_invalid_date_range(self):
         """测试无效的日期范围"""
@@ -0,0 +1,48 @@
+"""
+Tests for the cli module
+"""
+
+import json
+import pstats
+import sys
+
+import pytest
+from schedule_generator import cli
+
+
+def _run_cli(monkeypatch, capsys, *args):
+    monkeypatch.setattr(sys, "argv", ["cli.py", *args])
+    cli.main()
+    return capsys.readouterr().out
+
+
+class TestCommands:
+    def test_daily(self, monkeypatch, capsys):
+        """测试每日模式命令"""
+        output = _run_cli(monkeypatch, capsys, "daily", "2022-05-01", "2022-05-10", "3", "Asia/Shanghai", "08:30 PM")
+        result = json.loads(output)
+        assert [d["start_time"] for d in result] == [
+            "2022-05-01 20:30", "2022-05-04 20:30", "2022-05-07 20:30", "2022-05-10 20:30"
+        ]
+
+
+class TestProfile:
+    def test_profile_report(self, monkeypatch, capsys, tmp_path):
+        """测试性能分析报告和 pstats 文件"""
+        pstats_path = str(tmp_path / "daily.pstats")
+        output = _run_cli(
+            monkeypatch, capsys, "profile", "--top", "5", "--pstats", pstats_path,
+            "daily", "2022-05-01", "2022-05-10", "3", "Asia/Shanghai", "08:30 PM"
+        )
+
+        assert "周期事件数量: 4" in output
+        assert "每秒周期事件数" in output
+        assert "内存峰值" in output
+        assert "calc_daily_distributions" in output
+        assert pstats.Stats(pstats_path).total_calls > 0
+
+    def test_profile_without_command(self, monkeypatch, capsys):
+        """测试缺少计算命令"""
+        with pytest.raises(SystemExit):
+            _run_cli(monkeypatch, capsys, "profile", "--top", "5")
+        assert "性能分析需要一个计算命令" in capsys.readouterr().out
@@ -0,0 +1,134 @@
+"""
+Tests for the date_index module
+"""
+
+import datetime
+
+from schedule_generator.calculator import calc_distributions_by_pattern
+from schedule_generator.date_index import ScheduleDateIndex
+
+
+SCHEDULES = {
+    "daily": {
+        "Pattern": "Daily",
+        "DailyOptions": {"EveryDays": 3},
+        "StartTime": "08:30 PM",
+        "TimeZone": {"Name": "Asia/Shanghai"},
+        "Range": {"StartDateAt": "2022-05-01", "EndDateAt": "2022-08-31"},
+    },
+    "weekly": {
+        "Pattern": "Weekly",
+        "WeeklyOptions": {"RecursiveEveryWeeks": 2, "WeekDays": ["Sunday", "Monday"]},
+        "StartTime": "02:30 AM",
+        "TimeZone": {"Name": "America/New_York"},
+        "Range": {"StartDateAt": "2022-02-17", "EndDateAt": "2022-07-31"},
+        "Exclusions": {"Dates": ["2022-05-22"]},
+    },
+    "monthly-days": {
+        "Pattern": "Monthly",
+        "MonthlyOptions": {"Type": "ByDays", "ByDays": {"Days": 31, "EveryMonths": 2}},
+        "StartTime": "12:00 AM",
+        "TimeZone": {"Name": "Asia/Shanghai"},
+        "Range": {"StartDateAt": "2022-01-15", "EndDateAt": "2022-12-31"},
+    },
+    "monthly-weeks": {
+        "Pattern": "Monthly",
+        "MonthlyOptions": {
+            "Type": "ByWeekDays", "ByWeekDays": {"Ordinal": "Last", "WeekDay": "Friday", "EveryMonths": 1}
+        },
+        "StartTime": "09:00 AM",
+        "TimeZone": {"Name": "Asia/Shanghai"},
+        "Range": {"StartDateAt": "2022-01-01", "EndDateAt": "2022-12-31"},
+    },
+}
+
+
+def _get_expected_by_date():
+    expected = {}
+    for schedule_id, schedule in SCHEDULES.items():
+        for distribution in calc_distributions_by_pattern(schedule):
+            expected.setdefault(distribution["start_time"][:10], set()).add(schedule_id)
+    return expected
+
+
+class TestScheduleDateIndex:
+    def test_same_as_expansion(self):
+        """测试索引结果与逐个计算周期事件的结果一致"""
+        index = ScheduleDateIndex()
+        for schedule_id, schedule in SCHEDULES.items():
+            index.insert(schedule_id, schedule)
+        expected = _get_expected_by_date()
+
+        day = datetime.date(2022, 1, 1)
+        while day <= datetime.date(2023, 1, 31):
+            assert index.get_schedules_by_date(day.isoformat()) == expected.get(day.isoformat(), set())
+            day += datetime.timedelta(days=1)
+
+    def test_by_hour(self):
+        """测试按小时查询，夏令时跳过的时间顺延"""
+        index = ScheduleDateIndex()
+        for schedule_id, schedule in SCHEDULES.items():
+            index.insert(schedule_id, schedule)
+
+        assert index.get_schedules_by_date("2022-03-31", 0) == {"monthly-days"}
+        assert index.get_schedules_by_date("2022-03-14", 2) == {"weekly"}
+        assert index.get_schedules_by_date("2022-03-14", 3) == set()
+        assert index.get_schedules_by_date("2022-03-13", 3) == {"weekly"}  # 2022-03-13 02:30 doesn't exist
+        assert index.get_schedules_by_date("2022-05-22") == {"daily"}  # the weekly instance is excluded
+
+    def test_sub_daily(self):
+        """测试跨天的每小时重复，夏令时跳过的时间被略过"""
+        index = ScheduleDateIndex()
+        index.insert("hourly", {
+            "Pattern": "Hourly",
+            "HourlyOptions": {"EveryHours": 2},
+            "StartTime": "10:00 PM",
+            "EndTime": "02:00 AM",
+            "TimeZone": {"Name": "America/New_York"},
+            "Range": {"StartDateAt": "2022-03-12", "EndDateAt": "2022-03-13"},
+        })
+
+        assert index.get_schedules_by_date("2022-03-11") == set()
+        assert index.get_schedules_by_date("2022-03-12", 22) == {"hourly"}
+        assert index.get_schedules_by_date("2022-03-12", 0) == set()
+        assert index.get_schedules_by_date("2022-03-13", 0) == {"hourly"}
+        assert index.get_schedules_by_date("2022-03-13", 2) == set()  # 2022-03-13 02:00 doesn't exist
+        assert index.get_schedules_by_date("2022-03-14", 2) == {"hourly"}
+        assert index.get_schedules_by_date("2022-03-14", 22) == set()
+
+    def test_sub_daily_longer_than_a_day(self):
+        """测试间隔超过一天的每小时重复与逐个计算的结果一致"""
+        schedule = {
+            "Pattern": "Hourly",
+            "HourlyOptions": {"EveryHours": 30},
+            "StartTime": "10:00 PM",
+            "TimeZone": {"Name": "America/New_York"},
+            "Range": {"StartDateAt": "2022-03-01", "EndDateAt": "2022-03-31"},
+        }
+        index = ScheduleDateIndex()
+        index.insert("hourly", schedule)
+        expected = {
+            (distribution["start_time"][:10], int(distribution["start_time"][11:13]))
+            for distribution in calc_distributions_by_pattern(schedule)
+        }
+
+        day = datetime.date(2022, 2, 28)
+        while day <= datetime.date(2022, 4, 3):
+            for hour in range(24):
+                has_instance = index.get_schedules_by_date(day.isoformat(), hour) == {"hourly"}
+                assert has_instance == ((day.isoformat(), hour) in expected)
+            day += datetime.timedelta(days=1)
+
+    def test_insert_and_remove(self):
+        """测试增量插入和删除"""
+        index = ScheduleDateIndex()
+        index.insert("daily", SCHEDULES["daily"])
+        assert index.get_schedules_by_date("2022-05-04") == {"daily"}
+
+        index.insert("daily", dict(SCHEDULES["daily"], DailyOptions={"EveryDays": 2}))
+        assert index.get_schedules_by_date("2022-05-04") == set()
+        assert index.get_schedules_by_date("2022-05-05") == {"daily"}
+
+        index.remove("daily")
+        assert len(index) == 0
+        assert index.get_schedules_by_date("2022-05-05") == set()
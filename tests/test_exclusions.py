@@ -0,0 +1,86 @@
+"""
+Tests for the exclusions module
+"""
+
+import pytest
+from schedule_generator.calculator import calc_distributions_by_pattern
+from schedule_generator.exclusions import (
+    EXCLUSION_CALENDARS,
+    _compile_exclusion_days,
+    compile_exclusions,
+    register_exclusion_calendar,
+)
+
+
+@pytest.fixture
+def exclusion_calendars():
+    """恢复测试中注册的排除日历"""
+    registered = dict(EXCLUSION_CALENDARS)
+    yield EXCLUSION_CALENDARS
+    EXCLUSION_CALENDARS.clear()
+    EXCLUSION_CALENDARS.update(registered)
+    _compile_exclusion_days.cache_clear()
+
+
+def _get_schedule(pattern, exclusions=None):
+    schedule = {
+        "Pattern": pattern,
+        "DailyOptions": {
+            "EveryDays": 1
+        },
+        "WeeklyOptions": {
+            "RecursiveEveryWeeks": 1,
+            "WeekDays": ["Monday", "Friday"]
+        },
+        "MonthlyOptions": {
+            "Type": "ByDays",
+            "ByDays": {
+                "Days": 1,
+                "EveryMonths": 1
+            },
+        },
+        "StartTime": "09:00 AM",
+        "EndTime": "10:00 AM",
+        "TimeZone": {
+            "Name": "Asia/Shanghai",
+        },
+        "Range": {
+            "StartDateAt": "2022-09-01",
+            "EndDateAt": "2022-12-31"
+        }
+    }
+    if exclusions is not None:
+        schedule["Exclusions"] = exclusions
+    return schedule
+
+
+class TestExclusionDays:
+    def test_compiled_bitset(self):
+        """测试排除日期编译为位图"""
+        excluded_days = compile_exclusions({"Dates": ["2022-10-01", "2022-10-07"]})
+        assert excluded_days is compile_exclusions({"Dates": ["2022-10-07", "2022-10-01"]})
+        assert 738429 in excluded_days  # 2022-10-01
+        assert 738430 not in excluded_days
+        assert compile_exclusions({"Dates": []}) is None
+
+    def test_unknown_calendar(self):
+        """测试未注册的排除日历"""
+        with pytest.raises(ValueError, match="Unknown exclusion calendar"):
+            compile_exclusions({"Calendars": ["Unknown"]})
+
+
+class TestExcludedDistributions:
+    def test_exclusions_by_pattern(self, exclusion_calendars):
+        """测试各个模式跳过排除日期"""
+        register_exclusion_calendar("CN-National-Day", [f"2022-10-0{day}" for day in range(1, 8)])
+        exclusions = {"Dates": ["2022-12-02"], "Calendars": ["CN-National-Day"]}
+        excluded_dates = {"2022-12-02"} | {f"2022-10-0{day}" for day in range(1, 8)}
+
+        for pattern in ("Daily", "Weekly", "Monthly"):
+            expected = [
+                distribution for distribution in calc_distributions_by_pattern(_get_schedule(pattern))
+                if distribution["start_time"][:10] not in excluded_dates
+            ]
+            result = calc_distributions_by_pattern(_get_schedule(pattern, exclusions))
+            assert result == expected
+            assert len(result) < len(calc_distributions_by_pattern(_get_schedule(pattern)))
@@ -0,0 +1,112 @@
+"""
+Tests for the export module
+"""
+
+import timeit
+
+import arrow
+import pytest
+from schedule_generator.calculator import calc_distributions_by_pattern
+from schedule_generator.store import DistributionStore, get_distributions_epochs
+
+pd = pytest.importorskip("pandas")
+pa = pytest.importorskip("pyarrow")
+
+from schedule_generator.export import iter_dataframes, iter_record_batches, to_arrow_table, to_dataframe  # noqa: E402
+
+
+SCHEDULE = {
+    "Pattern": "Daily",
+    "DailyOptions": {
+        "EveryDays": 1
+    },
+    "StartTime": "02:30 AM",
+    "EndTime": "01:00 AM",
+    "TimeZone": {
+        "Name": "America/New_York",
+    },
+    "Range": {
+        "StartDateAt": "2022-03-10",
+        "EndDateAt": "2022-03-20"
+    }
+}
+
+SCHEDULE_WITHOUT_END = {key: value for key, value in SCHEDULE.items() if key != "EndTime"}
+
+
+def _format(timestamp):
+    return timestamp.strftime("%Y-%m-%d %H:%M")
+
+
+class TestDataFrameExport:
+    def test_to_dataframe(self):
+        """测试导出为带时区的 DataFrame"""
+        df = to_dataframe("schedule-1", SCHEDULE)
+        distributions = calc_distributions_by_pattern(SCHEDULE)
+
+        assert list(df.columns) == ["schedule_id", "start", "end"]
+        assert str(df["start"].dt.tz) == "America/New_York"
+        assert [_format(value) for value in df["start"]] == [d["start_time"] for d in distributions]
+        assert [_format(value) for value in df["end"]] == [d["end_time"] for d in distributions]
+        assert set(df["schedule_id"]) == {"schedule-1"}
+
+    def test_iter_dataframes(self):
+        """测试批量导出时按批次输出"""
+        schedules = [("schedule-1", SCHEDULE), ("schedule-2", SCHEDULE_WITHOUT_END), ("schedule-3", SCHEDULE)]
+        dataframes = list(iter_dataframes(schedules, batch_rows=20))
+
+        assert [len(df) for df in dataframes] == [22, 11]
+        assert dataframes[0]["end"].isna().sum() == 11
+        assert str(dataframes[0]["start"].dt.tz) == "UTC"
+
+
+class TestArrowExport:
+    def test_to_arrow_table_from_store(self, tmp_path):
+        """测试从持久化存储导出为 pyarrow Table"""
+        with DistributionStore(str(tmp_path)).load_or_calc("schedule-1", SCHEDULE) as stored:
+            table = to_arrow_table("schedule-1", SCHEDULE, stored)
+            assert table.column("start").type == pa.timestamp("s", tz="America/New_York")
+            assert table.num_rows == len(stored)
+            assert table.column("start")[0].as_py().timestamp() == stored.start_times[0]
+            del table
+
+    def test_iter_record_batches(self):
+        """测试批量导出为 record batch"""
+        schedules = [("schedule-1", SCHEDULE), ("schedule-2", SCHEDULE_WITHOUT_END)]
+        batches = list(iter_record_batches(schedules, timezone="Asia/Shanghai"))
+
+        assert len(batches) == 1
+        batch = batches[0]
+        assert batch.num_rows == 22
+        assert batch.column(2).null_count == 11
+        assert batch.column(0).to_pylist()[-1] == "schedule-2"
+        assert _format(batch.column(1)[0].as_py()) == "2022-03-10 15:30"
+
+
+class TestEpochColumns:
+    def test_epochs_match_arrow_around_dst(self):
+        """测试时间戳列与 Arrow 解析的结果一致，包括夏令时切换的日期"""
+        for timezone in ("America/New_York", "America/Santiago", "Australia/Lord_Howe", "UTC"):
+            schedule = dict(SCHEDULE, TimeZone={"Name": timezone}, Range={
+                "StartDateAt": "2021-01-01", "EndDateAt": "2022-12-31"
+            })
+            distributions = calc_distributions_by_pattern(schedule)
+            expected = [
+                arrow.get(distribution[key], "YYYY-MM-DD HH:mm", tzinfo=timezone).int_timestamp
+                for key in ("start_time", "end_time") for distribution in distributions
+            ]
+            table = to_arrow_table("schedule-1", schedule, distributions)
+            exported = table.column("start").cast(pa.int64()).to_pylist() + \
+                table.column("end").cast(pa.int64()).to_pylist()
+            start_times, end_times = get_distributions_epochs(distributions, timezone)
+            assert exported == expected
+            assert list(start_times) + list(end_times) == expected
+
+    @pytest.mark.slow
+    def test_export_cheaper_than_expansion(self):
+        """测试导出比计算周期事件更快"""
+        schedule = dict(SCHEDULE, Range={"StartDateAt": "1995-01-01", "EndDateAt": "2025-12-31"})
+        distributions = calc_distributions_by_pattern(schedule)
+        expansion = min(timeit.repeat(lambda: calc_distributions_by_pattern(schedule), number=1, repeat=3))
+        export = min(timeit.repeat(lambda: to_dataframe("schedule-1", schedule, distributions), number=1, repeat=3))
+        assert export < expansion
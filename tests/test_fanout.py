@@ -0,0 +1,51 @@
+"""
+Tests for the fanout module
+"""
+
+import pytest
+from schedule_generator.calculator import calc_distributions_by_pattern
+from schedule_generator.fanout import calc_distributions_by_pattern_for_timezones, flatten_timezone_distributions
+
+
+SCHEDULE = {
+    "Pattern": "Weekly",
+    "WeeklyOptions": {
+        "RecursiveEveryWeeks": 1,
+        "WeekDays": ["Sunday", "Wednesday"]
+    },
+    "StartTime": "02:30 AM",
+    "EndTime": "01:00 AM",
+    "TimeZone": {
+        "Name": "Asia/Shanghai",
+    },
+    "Range": {
+        "StartDateAt": "2022-01-01",
+        "EndDateAt": "2022-12-31"
+    }
+}
+
+TIMEZONES = ["Asia/Shanghai", "America/New_York", "Europe/London", "Australia/Lord_Howe", "America/Santiago"]
+
+
+class TestTimezonesFanOut:
+    def test_same_as_expansion_per_timezone(self):
+        """测试多时区结果与逐个时区计算的结果一致"""
+        results = calc_distributions_by_pattern_for_timezones(SCHEDULE, TIMEZONES)
+
+        assert list(results) == TIMEZONES
+        for timezone in TIMEZONES:
+            assert results[timezone] == calc_distributions_by_pattern(dict(SCHEDULE, TimeZone={"Name": timezone}))
+        assert {"start_time": "2022-03-13 03:30", "end_time": "2022-03-14 01:00"} in results["America/New_York"]
+
+    def test_flatten_table(self):
+        """测试展开为带时区列的表格"""
+        results = calc_distributions_by_pattern_for_timezones(SCHEDULE, ["UTC", "Asia/Tokyo"])
+        table = flatten_timezone_distributions(results)
+
+        assert len(table) == len(results["UTC"]) * 2
+        assert table[0] == {"timezone": "UTC", **results["UTC"][0]}
+
+    def test_unknown_timezone(self):
+        """测试未知时区"""
+        with pytest.raises(ValueError, match="Unknown timezone"):
+            calc_distributions_by_pattern_for_timezones(SCHEDULE, ["Mars/Olympus"])
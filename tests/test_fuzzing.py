@@ -0,0 +1,69 @@
+"""
+Tests for the fuzzing module
+"""
+
+import inspect
+import random
+
+from schedule_generator import oracle
+from schedule_generator.calculator import (
+    calc_daily_distributions,
+    calc_weekly_distributions,
+    calc_monthly_distributions_by_days,
+    calc_monthly_distributions_by_weeks,
+)
+from schedule_generator.fuzzing import (
+    DAILY,
+    MONTHLY_BY_DAYS,
+    MONTHLY_BY_WEEKS,
+    WEEKLY,
+    check_engine,
+    check_engines,
+    format_reports,
+    generate_case,
+)
+
+
+def _drop_midnight_instances(**kwargs):
+    return [d for d in calc_weekly_distributions(**kwargs) if not d["start_time"].endswith("00:00")]
+
+
+class TestCheckEngines:
+    def test_calculator_same_as_oracle(self):
+        """测试当前的计算函数与基准实现一致"""
+        reports = check_engines(
+            [
+                (DAILY, calc_daily_distributions),
+                (WEEKLY, calc_weekly_distributions),
+                (MONTHLY_BY_DAYS, calc_monthly_distributions_by_days),
+                (MONTHLY_BY_WEEKS, calc_monthly_distributions_by_weeks),
+            ],
+            cases=20,
+            max_range_days=400,
+        )
+
+        assert [report.mismatches for report in reports] == [[], [], [], []]
+        assert all(report.cases == 20 and report.instances > 0 for report in reports)
+        assert "calc_daily_distributions" in format_reports(reports)
+
+    def test_shrink_mismatch(self):
+        """测试不一致的用例被缩减为最简用例"""
+        report = check_engine(WEEKLY, _drop_midnight_instances, cases=200)
+
+        assert len(report.mismatches) == 1
+        shrunk_case = report.mismatches[0].shrunk_case
+        assert shrunk_case["range_start_date"] == shrunk_case["range_end_date"]
+        assert shrunk_case["schedule_start"] == "12:00 AM"
+        assert shrunk_case["timezone"] == "UTC"
+        assert len(shrunk_case["weekdays"]) == 1
+        assert report.mismatches[0].expected != report.mismatches[0].actual
+        assert "FAIL" in format_reports([report])
+
+    def test_same_seed_same_cases(self):
+        """测试相同的随机种子生成相同的用例"""
+        assert generate_case(MONTHLY_BY_WEEKS, random.Random(7)) == generate_case(MONTHLY_BY_WEEKS, random.Random(7))
+
+    def test_oracle_calls_no_calculator_function(self):
+        """测试参照实现不调用 calculator 中可能被优化的函数"""
+        for name, member in inspect.getmembers(oracle, inspect.isfunction):
+            assert member.__module__ == oracle.__name__, name
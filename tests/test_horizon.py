@@ -0,0 +1,130 @@
+"""
+Tests for the horizon module
+"""
+
+import json
+
+import pytest
+from schedule_generator.calculator import calc_distributions_by_pattern
+from schedule_generator.horizon import HorizonMaterializer
+
+
+SCHEDULES = {
+    "daily": {
+        "Pattern": "Daily",
+        "DailyOptions": {
+            "EveryDays": 3
+        },
+        "StartTime": "08:30 PM",
+        "EndTime": "11:00 PM",
+        "TimeZone": {
+            "Name": "Asia/Shanghai",
+        },
+        "Range": {
+            "StartDateAt": "2022-01-01",
+            "EndDateAt": "2022-12-31"
+        }
+    },
+    "monthly": {
+        "Pattern": "Monthly",
+        "MonthlyOptions": {
+            "Type": "ByWeekDays",
+            "ByWeekDays": {
+                "Ordinal": "Last",
+                "WeekDay": "Friday",
+                "EveryMonths": 2
+            }
+        },
+        "StartTime": "12:00 AM",
+        "TimeZone": {
+            "Name": "America/New_York",
+        },
+        "Range": {
+            "StartDateAt": "2021-11-20",
+            "EndDateAt": "2023-03-31"
+        }
+    },
+}
+
+
+def _get_expected(today, until):
+    return {
+        (schedule_id, distribution["start_time"])
+        for schedule_id, schedule in SCHEDULES.items()
+        for distribution in calc_distributions_by_pattern(schedule)
+        if today <= distribution["start_time"][:10] <= until
+    }
+
+
+def _get_materialized(materializer):
+    return {(schedule_id, distribution["start_time"]) for schedule_id, distribution in materializer.query(0, 2 ** 40)}
+
+
+class TestHorizonMaterializer:
+    def test_advance_materializes_only_tail(self):
+        """测试推进时间只计算新增的尾部并清除过期的周期事件"""
+        materializer = HorizonMaterializer(horizon_days=30)
+        for schedule_id, schedule in SCHEDULES.items():
+            materializer.add(schedule_id, schedule)
+
+        materializer.advance("2022-05-01")
+        assert _get_materialized(materializer) == _get_expected("2022-05-01", "2022-05-31")
+
+        new_count = materializer.advance("2022-05-20")
+        assert new_count == len(_get_expected("2022-06-01", "2022-06-19"))
+        assert _get_materialized(materializer) == _get_expected("2022-05-20", "2022-06-19")
+
+        materializer.advance("2022-12-20")
+        assert _get_materialized(materializer) == _get_expected("2022-12-20", "2023-01-19")
+
+    def test_query_sorted_by_start_time(self):
+        """测试按时间查询的结果按开始时间排序"""
+        materializer = HorizonMaterializer(horizon_days=60)
+        for schedule_id, schedule in SCHEDULES.items():
+            materializer.add(schedule_id, schedule)
+        materializer.advance("2022-03-01")
+
+        # 2022-03-23 00:00 to 2022-03-26 00:00 Asia/Shanghai
+        instances = materializer.query(1647964800, 1648224000)
+        assert instances == [
+            ("daily", {"start_time": "2022-03-23 20:30", "end_time": "2022-03-23 23:00"}),
+            ("monthly", {"start_time": "2022-03-25 00:00"}),
+        ]
+
+    def test_checkpoint_and_restore(self):
+        """测试保存和恢复状态后可以继续推进"""
+        materializer = HorizonMaterializer(horizon_days=30)
+        for schedule_id, schedule in SCHEDULES.items():
+            materializer.add(schedule_id, schedule)
+        materializer.advance("2022-05-01")
+
+        restored = HorizonMaterializer.restore(json.loads(json.dumps(materializer.checkpoint())))
+        assert restored.query(0, 2 ** 40) == materializer.query(0, 2 ** 40)
+
+        restored.advance("2022-07-01")
+        assert _get_materialized(restored) == _get_expected("2022-07-01", "2022-07-31")
+        with pytest.raises(ValueError, match="Horizon can not move backwards"):
+            restored.advance("2022-06-01")
+
+    def test_add_after_advance(self):
+        """测试推进后添加的周期事件立即计算，并按各自时区的日期清除"""
+        materializer = HorizonMaterializer(horizon_days=30)
+        materializer.advance("2022-05-01")
+        for schedule_id, schedule in SCHEDULES.items():
+            materializer.add(schedule_id, schedule)
+        assert _get_materialized(materializer) == _get_expected("2022-05-01", "2022-05-31")
+
+        # the instances of the same wall time are a day apart in epoch between the two sides of the date line
+        for schedule_id, timezone in (("kiritimati", "Pacific/Kiritimati"), ("pago-pago", "Pacific/Pago_Pago")):
+            schedule = dict(SCHEDULES["daily"], StartTime="11:30 PM", TimeZone={"Name": timezone})
+            schedule["DailyOptions"] = {"EveryDays": 1}
+            materializer.add(schedule_id, schedule)
+            assert materializer.query(0, 2 ** 40)[-1][1] != {}
+
+        materializer.advance("2022-05-20")
+        materialized = _get_materialized(materializer)
+        for schedule_id in ("kiritimati", "pago-pago"):
+            start_times = sorted(start_time for _id, start_time in materialized if _id == schedule_id)
+            assert start_times[0] == "2022-05-20 23:30"
+            assert start_times[-1] == "2022-06-19 23:30"
+        assert {item for item in materialized if item[0] in SCHEDULES} == _get_expected("2022-05-20", "2022-06-19")
@@ -0,0 +1,149 @@
+"""
+Tests for the incremental module
+"""
+
+import copy
+
+from schedule_generator.calculator import calc_distributions_by_pattern, calc_distributions_by_pattern_between
+from schedule_generator.incremental import calc_distributions_delta
+
+
+SCHEDULE = {
+    "Pattern": "Weekly",
+    "DailyOptions": {
+        "EveryDays": 2
+    },
+    "WeeklyOptions": {
+        "RecursiveEveryWeeks": 2,
+        "WeekDays": ["Saturday", "Monday"]
+    },
+    "MonthlyOptions": {
+        "Type": "ByWeekDays",
+        "ByDays": {
+            "Days": 31,
+            "EveryMonths": 1
+        },
+        "ByWeekDays": {
+            "Ordinal": "Last",
+            "WeekDay": "Friday",
+            "EveryMonths": 2
+        }
+    },
+    "StartTime": "08:30 PM",
+    "EndTime": "11:00 PM",
+    "TimeZone": {
+        "Name": "America/New_York",
+    },
+    "Range": {
+        "StartDateAt": "2022-01-12",
+        "EndDateAt": "2022-08-20"
+    }
+}
+
+
+def _apply_delta(previous, delta):
+    instances = {distribution["start_time"]: distribution for distribution in previous}
+    for distribution in delta["removed"]:
+        del instances[distribution["start_time"]]
+    for distribution in delta["added"] + delta["changed"]:
+        instances[distribution["start_time"]] = distribution
+    return sorted(instances.values(), key=lambda distribution: distribution["start_time"])
+
+
+def _sorted(distributions):
+    return sorted(distributions, key=lambda distribution: distribution["start_time"])
+
+
+class TestDistributionsBetween:
+    def test_between_matches_full_expansion_slice(self):
+        """测试区间计算结果与完整计算的对应片段一致"""
+        for pattern in ("Daily", "Weekly", "Monthly"):
+            schedule = dict(SCHEDULE, Pattern=pattern)
+            expected = [
+                distribution for distribution in calc_distributions_by_pattern(schedule)
+                if "2022-03-15" <= distribution["start_time"][:10] <= "2022-06-30"
+            ]
+            assert calc_distributions_by_pattern_between(schedule, "2022-03-15", "2022-06-30") == expected
+
+    def test_until_date_on_range_end(self):
+        """测试截止日期不早于结束日期时不返回之后开始的实例"""
+        hourly_schedule = {
+            "Pattern": "Hourly",
+            "HourlyOptions": {"EveryHours": 6},
+            "StartTime": "12:00 PM",
+            "TimeZone": {"Name": "Asia/Shanghai"},
+            "Range": {"StartDateAt": "2022-05-01", "EndDateAt": "2022-05-03"},
+        }
+        result = calc_distributions_by_pattern_between(hourly_schedule, "2022-05-03", "2022-05-03")
+        assert [d["start_time"] for d in result] == [
+            "2022-05-03 00:00", "2022-05-03 06:00", "2022-05-03 12:00", "2022-05-03 18:00",
+        ]
+        assert calc_distributions_by_pattern(hourly_schedule)[-1]["start_time"] == "2022-05-04 06:00"
+
+        monthly_schedule = {
+            "Pattern": "Monthly",
+            "MonthlyOptions": {"Type": "ByDays", "ByDays": {"Days": 1, "EveryMonths": 1}},
+            "StartTime": "12:00 AM",
+            "TimeZone": {"Name": "Asia/Shanghai"},
+            "Range": {"StartDateAt": "2022-01-01", "EndDateAt": "2022-05-31"},
+        }
+        assert calc_distributions_by_pattern(monthly_schedule)[-1]["start_time"] == "2022-06-01 00:00"
+        result = calc_distributions_by_pattern_between(monthly_schedule, "2022-04-01", "2022-05-31")
+        assert [d["start_time"] for d in result] == ["2022-04-01 00:00", "2022-05-01 00:00"]
+        result = calc_distributions_by_pattern_between(monthly_schedule, "2022-04-01", "2022-06-30")
+        assert [d["start_time"] for d in result] == ["2022-04-01 00:00", "2022-05-01 00:00", "2022-06-01 00:00"]
+
+
+class TestDistributionsDelta:
+    def test_range_extended_and_truncated(self):
+        """测试只修改结束日期时的增量结果"""
+        for pattern in ("Daily", "Weekly", "Monthly"):
+            old_schedule = dict(SCHEDULE, Pattern=pattern)
+            previous = calc_distributions_by_pattern(old_schedule)
+            for end_date in ("2022-12-31", "2022-04-02"):
+                new_schedule = copy.deepcopy(old_schedule)
+                new_schedule["Range"]["EndDateAt"] = end_date
+
+                delta = calc_distributions_delta(old_schedule, new_schedule, previous)
+                assert not delta["changed"]
+                assert _apply_delta(previous, delta) == _sorted(calc_distributions_by_pattern(new_schedule))
+
+    def test_end_time_changed(self):
+        """测试只修改结束时间时只重新计算结束时间"""
+        previous = calc_distributions_by_pattern(SCHEDULE)
+        new_schedule = dict(SCHEDULE, EndTime="02:30 AM")
+
+        delta = calc_distributions_delta(SCHEDULE, new_schedule, previous)
+        assert not delta["added"] and not delta["removed"]
+        assert len(delta["changed"]) == len(previous)
+        assert _apply_delta(previous, delta) == _sorted(calc_distributions_by_pattern(new_schedule))
+
+    def test_other_changes_fall_back_to_full_diff(self):
+        """测试其它修改时回退到完整计算"""
+        previous = calc_distributions_by_pattern(SCHEDULE)
+        new_schedule = dict(SCHEDULE, StartTime="09:00 PM")
+
+        delta = calc_distributions_delta(SCHEDULE, new_schedule, previous)
+        assert len(delta["removed"]) == len(previous)
+        assert _apply_delta(previous, delta) == _sorted(calc_distributions_by_pattern(new_schedule))
+
+    def test_unchanged_schedule(self):
+        """测试未修改时没有任何变化"""
+        previous = calc_distributions_by_pattern(SCHEDULE)
+        assert calc_distributions_delta(SCHEDULE, copy.deepcopy(SCHEDULE), previous) == {
+            "added": [], "removed": [], "changed": []
+        }
+
+    def test_other_range_changes_fall_back_to_full_diff(self, monkeypatch):
+        """测试结束日期与其它范围字段同时修改时回退到完整计算"""
+        def _range_end_delta(*args):
+            raise AssertionError("only the end date is allowed to take the tail expansion")
+
+        monkeypatch.setattr("schedule_generator.incremental._calc_range_end_delta", _range_end_delta)
+        previous = calc_distributions_by_pattern(SCHEDULE)
+        new_schedule = copy.deepcopy(SCHEDULE)
+        new_schedule["Range"]["EndDateAt"] = "2022-12-31"
+        new_schedule["Range"]["Type"] = "EndByDate"
+
+        delta = calc_distributions_delta(SCHEDULE, new_schedule, previous)
+        assert _apply_delta(previous, delta) == _sorted(calc_distributions_by_pattern(new_schedule))
@@ -0,0 +1,152 @@
+"""
+Tests for the server module
+"""
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from schedule_generator import server as server_module
+from schedule_generator.calculator import calc_distributions_by_pattern, iter_distributions_by_pattern
+from schedule_generator.server import ScheduleServer
+
+
+DAILY_SCHEDULE = {
+    "Pattern": "Daily",
+    "DailyOptions": {"EveryDays": 1},
+    "StartTime": "08:30 PM",
+    "EndTime": "11:00 PM",
+    "TimeZone": {"Name": "Asia/Shanghai"},
+    "Range": {"StartDateAt": "2022-05-01", "EndDateAt": "2022-07-31"},
+}
+MONTHLY_SCHEDULE = {
+    "Pattern": "Monthly",
+    "MonthlyOptions": {"Type": "ByDays", "ByDays": {"Days": 31, "EveryMonths": 1}},
+    "StartTime": "09:00 AM",
+    "TimeZone": {"Name": "America/New_York"},
+    "Range": {"StartDateAt": "2022-01-01", "EndDateAt": "2023-12-31"},
+}
+MINUTELY_SCHEDULE = {
+    "Pattern": "Minutely",
+    "MinutelyOptions": {"EveryMinutes": 1},
+    "StartTime": "12:00 AM",
+    "TimeZone": {"Name": "Asia/Shanghai"},
+    "Range": {"StartDateAt": "2022-01-01", "EndDateAt": "2022-12-31"},
+}
+
+
+async def _request(port, requests):
+    # send all requests before reading any response, and collect the chunks of every request id
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for request in requests:
+        writer.write(request if isinstance(request, bytes) else json.dumps(request).encode("utf-8") + b"\n")
+    await writer.drain()
+
+    responses = {}
+    pending = len(requests)
+    while pending:
+        message = json.loads(await reader.readline())
+        response = responses.setdefault(message["id"], {"chunks": [], "done": None, "error": None})
+        if "chunk" in message:
+            response["chunks"].append(message["chunk"])
+        elif "done" in message:
+            response["done"] = message["count"]
+            pending -= 1
+        else:
+            response["error"] = message["error"]
+            pending -= 1
+    writer.close()
+    return responses
+
+
+def _run_server(coroutine_factory, **kwargs):
+    async def run():
+        with ThreadPoolExecutor(2) as executor:
+            async with ScheduleServer(port=0, executor=executor, **kwargs) as server:
+                return await coroutine_factory(server)
+    return asyncio.run(run())
+
+
+class TestScheduleServer:
+    def test_pipelined_requests(self):
+        """测试同一连接上并发的多个请求分块返回"""
+        responses = _run_server(
+            lambda server: _request(server.port, [
+                {"id": 1, "schedule": DAILY_SCHEDULE},
+                {"id": 2, "schedule": MONTHLY_SCHEDULE},
+                {"id": 3, "schedule": DAILY_SCHEDULE},
+            ]),
+            chunk_size=20,
+            max_pipelined=2,
+            inline_cost_limit=100,
+        )
+
+        for request_id, schedule in ((1, DAILY_SCHEDULE), (2, MONTHLY_SCHEDULE), (3, DAILY_SCHEDULE)):
+            expected = calc_distributions_by_pattern(schedule)
+            response = responses[request_id]
+            assert response["done"] == len(expected)
+            assert sum(response["chunks"], []) == expected
+            assert all(len(chunk) <= 20 for chunk in response["chunks"])
+        assert len(responses[1]["chunks"]) == 5
+
+    def test_errors(self):
+        """测试错误的请求返回错误信息，不影响其它请求"""
+        responses = _run_server(lambda server: _request(server.port, [
+            b"not json\n",
+            {
+                "id": "bad",
+                "schedule": {**DAILY_SCHEDULE, "Range": {"StartDateAt": "2022-05-02", "EndDateAt": "2022-05-01"}},
+            },
+            {"id": "good", "schedule": DAILY_SCHEDULE},
+        ]))
+
+        assert responses[None]["error"].startswith("JSONDecodeError")
+        assert responses["bad"]["error"] == "ValueError: Range start date is bigger than range end date"
+        assert responses["good"]["done"] == 92
+
+    def test_lru_cache(self):
+        """测试计算结果按最近使用保留"""
+        async def run(server):
+            await _request(server.port, [{"id": 1, "schedule": DAILY_SCHEDULE}])
+            await _request(server.port, [{"id": 2, "schedule": MONTHLY_SCHEDULE}])
+            return len(server._cache)
+
+        assert _run_server(run, cache_size=1) == 1
+
+    def test_lru_cache_bounded_by_instances(self):
+        """测试缓存按实例总数淘汰"""
+        async def run(server):
+            await _request(server.port, [{"id": 1, "schedule": DAILY_SCHEDULE}])
+            await _request(server.port, [{"id": 2, "schedule": MONTHLY_SCHEDULE}])
+            return len(server._cache), server._cached_instances
+
+        assert _run_server(run, cache_instances=100) == (1, 24)
+        assert _run_server(run, cache_instances=50) == (1, 24)
+        assert _run_server(run, cache_instances=10) == (0, 0)
+
+    def test_sub_daily_streamed_lazily(self, monkeypatch):
+        """测试客户端不读取时暂停生成分钟级的实例，且不缓存"""
+        generated = 0
+
+        def counting_iter(schedule):
+            nonlocal generated
+            for distribution in iter_distributions_by_pattern(schedule):
+                generated += 1
+                yield distribution
+
+        monkeypatch.setattr(server_module, "iter_distributions_by_pattern", counting_iter)
+
+        async def run(server):
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(json.dumps({"id": 1, "schedule": MINUTELY_SCHEDULE}).encode("utf-8") + b"\n")
+            await writer.drain()
+            first_chunk = json.loads(await reader.readline())["chunk"]
+            await asyncio.sleep(0.5)  # the client stops reading
+            paused_at = generated
+            writer.close()
+            return first_chunk, paused_at, len(server._cache)
+
+        first_chunk, paused_at, cached = _run_server(run)
+        assert first_chunk[0] == {"start_time": "2022-01-01 00:00"}
+        assert len(first_chunk) <= paused_at < 365 * 24 * 60 / 2
+        assert cached == 0
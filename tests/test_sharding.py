@@ -0,0 +1,126 @@
+"""
+Tests for the sharding module
+"""
+
+import datetime
+
+import pytest
+from schedule_generator.calculator import calc_distributions_by_pattern
+from schedule_generator.sharding import (
+    assign_schedules_to_shards,
+    estimate_schedule_cost,
+    run_shards_locally,
+)
+
+
+def _get_schedules(count):
+    patterns = [
+        {"Pattern": "Daily", "DailyOptions": {"EveryDays": 2}},
+        {"Pattern": "Weekly", "WeeklyOptions": {"RecursiveEveryWeeks": 1, "WeekDays": ["Monday", "Friday"]}},
+        {"Pattern": "Monthly", "MonthlyOptions": {"Type": "ByDays", "ByDays": {"Days": 31, "EveryMonths": 1}}},
+    ]
+    schedules = {}
+    for i in range(count):
+        range_start = datetime.date(2022, 1, 1) + datetime.timedelta(days=i % 50)
+        schedules[f"schedule-{i}"] = {
+            **patterns[i % len(patterns)],
+            "StartTime": "08:30 PM",
+            "TimeZone": {"Name": "Asia/Shanghai"},
+            "Range": {
+                "StartDateAt": range_start.isoformat(),
+                "EndDateAt": (range_start + datetime.timedelta(days=7 + i * 3 % 400)).isoformat(),
+            },
+        }
+    return schedules
+
+
+def _get_shard_by_id(shards):
+    return {schedule_id: shard for shard, schedule_ids in enumerate(shards) for schedule_id in schedule_ids}
+
+
+class TestAssignSchedulesToShards:
+    def test_estimate_cost(self):
+        """测试长区间的按月周期比短区间的按日周期代价更高"""
+        monthly = {
+            "Pattern": "Monthly",
+            "MonthlyOptions": {"Type": "ByDays", "ByDays": {"Days": 1, "EveryMonths": 1}},
+            "Range": {"StartDateAt": "2000-01-01", "EndDateAt": "2049-12-31"},
+        }
+        daily = {
+            "Pattern": "Daily",
+            "DailyOptions": {"EveryDays": 1},
+            "Range": {"StartDateAt": "2022-05-01", "EndDateAt": "2022-05-07"},
+        }
+        assert estimate_schedule_cost(monthly) > estimate_schedule_cost(daily) * 1000
+
+    def test_estimate_cost_follows_timings(self):
+        """测试估算代价与实际计算耗时的顺序一致"""
+        base = {
+            "StartTime": "09:00 AM",
+            "EndTime": "10:00 AM",
+            "TimeZone": {"Name": "America/New_York"},
+            "Range": {"StartDateAt": "2020-01-01", "EndDateAt": "2022-12-31"},
+        }
+        monthly = dict(base, Pattern="Monthly", MonthlyOptions={
+            "Type": "ByDays", "ByDays": {"Days": 15, "EveryMonths": 1}
+        })
+        yearly = dict(base, Pattern="Monthly", MonthlyOptions={
+            "Type": "ByWeekDays", "ByWeekDays": {"Ordinal": "Last", "WeekDay": "Friday", "EveryMonths": 12}
+        })
+        every_4_weeks = dict(base, Pattern="Weekly", WeeklyOptions={"RecursiveEveryWeeks": 4, "WeekDays": ["Monday"]})
+        weekdays = dict(base, Pattern="Weekly", WeeklyOptions={
+            "RecursiveEveryWeeks": 1, "WeekDays": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+        })
+        hourly = dict(base, Pattern="Hourly", HourlyOptions={"EveryHours": 1})
+        minutely = dict(base, Pattern="Minutely", MinutelyOptions={"EveryMinutes": 5}, EndTime="05:00 PM")
+        daily = dict(base, Pattern="Daily", DailyOptions={"EveryDays": 1})
+        daily_30_years = dict(daily, Range={"StartDateAt": "2000-01-01", "EndDateAt": "2029-12-31"})
+
+        # every schedule took about twice as long as the next one or longer when measured, so the estimates
+        # have to keep the order. e.g. 580ms, 88ms, 22ms, 11ms and 3ms for the first chain
+        for chain in (
+                [yearly, minutely, daily_30_years, hourly, daily],
+                [weekdays, daily_30_years, every_4_weeks, daily],
+                [monthly, daily_30_years],
+        ):
+            costs = [estimate_schedule_cost(schedule) for schedule in chain]
+            assert costs == sorted(costs, reverse=True) and len(set(costs)) == len(costs)
+
+    def test_balanced_and_deterministic(self):
+        """测试各分片的估算代价均衡且结果稳定"""
+        schedules = _get_schedules(600)
+        shards = assign_schedules_to_shards(schedules, 4, load_factor=1.2)
+
+        assert sorted(sum(shards, [])) == sorted(schedules)
+        loads = [sum(estimate_schedule_cost(schedules[schedule_id]) for schedule_id in shard) for shard in shards]
+        assert max(loads) <= sum(loads) / 4 * 1.2
+        assert assign_schedules_to_shards(dict(reversed(list(schedules.items()))), 4, load_factor=1.2) == shards
+
+    def test_minimal_reshuffling(self):
+        """测试增加分片时只有少量周期事件更换分片"""
+        schedules = _get_schedules(600)
+        before = _get_shard_by_id(assign_schedules_to_shards(schedules, 4))
+        after = _get_shard_by_id(assign_schedules_to_shards(schedules, 5))
+
+        moved = sum(before[schedule_id] != after[schedule_id] for schedule_id in schedules)
+        assert moved < len(schedules) * 0.35  # moving by modulo would reshuffle about 80% of them
+
+    def test_invalid_shard_count(self):
+        """测试无效的分片数量"""
+        with pytest.raises(ValueError, match="Shard count should be positive"):
+            assign_schedules_to_shards(_get_schedules(3), 0)
+
+
+class TestRunShardsLocally:
+    def test_same_as_expansion(self):
+        """测试多进程模拟节点的结果与直接计算一致"""
+        schedules = _get_schedules(12)
+        results = run_shards_locally(schedules, 3)
+
+        assert [result.shard for result in results] == [0, 1, 2]
+        distributions = {}
+        for result in results:
+            distributions.update(result.distributions)
+        assert distributions == {
+            schedule_id: calc_distributions_by_pattern(schedule) for schedule_id, schedule in schedules.items()
+        }
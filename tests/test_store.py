@@ -0,0 +1,136 @@
+"""
+Tests for the store module
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from schedule_generator.calculator import calc_distributions_by_pattern
+from schedule_generator.store import DistributionStore, get_schedule_fingerprint
+
+
+SCHEDULE = {
+    "Pattern": "Daily",
+    "DailyOptions": {
+        "EveryDays": 1
+    },
+    "StartTime": "02:30 AM",
+    "EndTime": "01:00 AM",
+    "TimeZone": {
+        "Name": "America/New_York",
+    },
+    "Range": {
+        "StartDateAt": "2022-03-01",
+        "EndDateAt": "2022-11-30"
+    }
+}
+
+
+def _save_schedules(directory, worker):
+    store = DistributionStore(directory)
+    for i in range(25):
+        store.save(f"schedule-{worker}-{i}", dict(SCHEDULE, StartTime=f"{i % 12 + 1:02d}:00 AM"), [])
+
+
+class TestDistributionStore:
+    def test_round_trip(self, tmp_path):
+        """测试存储后读取的结果与计算结果一致"""
+        store = DistributionStore(str(tmp_path))
+        store.save("schedule-1", SCHEDULE, calc_distributions_by_pattern(SCHEDULE))
+
+        with DistributionStore(str(tmp_path)).load("schedule-1", SCHEDULE) as stored:
+            assert len(stored) == 275
+            assert stored.to_distributions() == calc_distributions_by_pattern(SCHEDULE)
+            assert stored.to_distributions(12, 13) == [
+                {"start_time": "2022-03-13 03:30", "end_time": "2022-03-14 01:00"}
+            ]
+            assert stored.start_times[1] - stored.start_times[0] == 24 * 3600
+
+    def test_without_end_time(self, tmp_path):
+        """测试没有结束时间的存储"""
+        schedule = {key: value for key, value in SCHEDULE.items() if key != "EndTime"}
+        with DistributionStore(str(tmp_path)).load_or_calc("schedule-1", schedule) as stored:
+            assert stored.end_times is None
+            assert stored.to_distributions() == calc_distributions_by_pattern(schedule)
+
+    def test_invalidated_by_definition_change(self, tmp_path):
+        """测试周期事件定义修改后存储失效"""
+        store = DistributionStore(str(tmp_path))
+        store.load_or_calc("schedule-1", SCHEDULE).close()
+        changed = dict(SCHEDULE, StartTime="09:00 AM")
+
+        assert store.load("schedule-1", changed) is None
+        with store.load_or_calc("schedule-1", changed) as stored:
+            assert stored.to_distributions(0, 1) == [{"start_time": "2022-03-01 09:00", "end_time": "2022-03-02 01:00"}]
+        assert not (tmp_path / (get_schedule_fingerprint(SCHEDULE) + ".bin")).exists()
+
+        store.remove("schedule-1")
+        assert DistributionStore(str(tmp_path)).load("schedule-1", changed) is None
+
+    def test_batch_writes_index_once(self, tmp_path, monkeypatch):
+        """测试批量存储只写一次索引"""
+        store = DistributionStore(str(tmp_path))
+        writes = []
+        write_atomically = store._write_atomically
+        monkeypatch.setattr(store, "_write_atomically", lambda path, content: (
+            writes.append(path), write_atomically(path, content)
+        ))
+        with store.batch():
+            for i in range(20):
+                store.save(f"schedule-{i}", SCHEDULE, [])
+            store.remove("schedule-0")
+        assert sum(path.endswith("index.json") for path in writes) == 1
+
+        reopened = DistributionStore(str(tmp_path))
+        assert reopened.load("schedule-0", SCHEDULE) is None
+        with reopened.load("schedule-19", SCHEDULE) as stored:
+            assert len(stored) == 0
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_shared_directory_keeps_entries_of_other_stores(self, tmp_path):
+        """测试多个存储实例共用目录时保留彼此的索引"""
+        changed = dict(SCHEDULE, StartTime="09:00 AM")
+        first, second = DistributionStore(str(tmp_path)), DistributionStore(str(tmp_path))
+        first.save("schedule-1", SCHEDULE, calc_distributions_by_pattern(SCHEDULE))
+        second.save("schedule-2", SCHEDULE, calc_distributions_by_pattern(SCHEDULE))
+        first.save("schedule-3", changed, [])
+
+        reopened = DistributionStore(str(tmp_path))
+        for schedule_id, schedule in (("schedule-1", SCHEDULE), ("schedule-2", SCHEDULE), ("schedule-3", changed)):
+            reopened.load(schedule_id, schedule).close()
+
+        # the data file is still referred to by schedule-2 of the other store
+        first.remove("schedule-1")
+        assert (tmp_path / (get_schedule_fingerprint(SCHEDULE) + ".bin")).exists()
+        second.remove("schedule-2")
+        assert not (tmp_path / (get_schedule_fingerprint(SCHEDULE) + ".bin")).exists()
+
+    def test_removed_by_other_store_while_saving(self, tmp_path):
+        """测试另一个存储实例删除同一定义时不会删掉刚存储的数据文件"""
+        first, second = DistributionStore(str(tmp_path)), DistributionStore(str(tmp_path))
+        first.save("schedule-2", SCHEDULE, calc_distributions_by_pattern(SCHEDULE))
+        with second.batch():
+            second.save("schedule-1", SCHEDULE, calc_distributions_by_pattern(SCHEDULE))
+            first.remove("schedule-2")
+
+        reopened = DistributionStore(str(tmp_path))
+        assert reopened.load("schedule-2", SCHEDULE) is None
+        with reopened.load("schedule-1", SCHEDULE) as stored:
+            assert stored.to_distributions() == calc_distributions_by_pattern(SCHEDULE)
+
+    def test_load_in_batch(self, tmp_path):
+        """测试批量存储中可以读取刚存储的配置"""
+        store = DistributionStore(str(tmp_path))
+        with store.batch():
+            with store.load_or_calc("schedule-1", SCHEDULE) as stored:
+                assert len(stored) == len(calc_distributions_by_pattern(SCHEDULE))
+
+    def test_processes_sharing_directory(self, tmp_path):
+        """测试多个进程同时写入同一目录时不丢失索引"""
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            list(executor.map(_save_schedules, [str(tmp_path)] * 4, range(4)))
+
+        store = DistributionStore(str(tmp_path))
+        for worker in range(4):
+            for i in range(25):
+                schedule = dict(SCHEDULE, StartTime=f"{i % 12 + 1:02d}:00 AM")
+                store.load(f"schedule-{worker}-{i}", schedule).close()